@@ -3,10 +3,27 @@ import re
 from django.contrib.auth import authenticate
 
 from django import forms
+from django.db import transaction
 
-from .models import UserProfile, Query, Invitation
+from tos.interpreters.registry import read_head
+from tos.interpreters.registry import sniff_format
+
+from .models import UserProfile, Query, QueryFile, Invitation
+from .tasks import build_tree
 from .tasks import invitation_email
 
+#: Bytes of the head of an upload searched for the cited references, the
+#: whole upload is not decompressed just to validate it
+REFERENCE_HEAD_SIZE = 1 << 20
+
+#: Patterns telling that an upload includes the cited references, by format
+REFERENCE_PATTERNS = {
+    'isi': [r'^CR', r'^ER$'],
+    'isibib': [r'(?i)^\s*Cited-References\s*='],
+    'scopusbib': [r'(?i)^\s*references\s*='],
+    'scopus': [r'\bReferences\b'],
+}
+
 
 class AuthenticationForm(forms.Form):
 
@@ -90,27 +107,64 @@ class QueryForm(forms.ModelForm):
 
     '''
     A form for a query user, raw_data and description are mandatory
-    fields on template form
+    fields on template form, several raw_data files may be uploaded
     '''
 
     class Meta:
         model = Query
         exclude = ['user', ]
         fields = ['raw_data', 'description', ]
+        widgets = {
+            'raw_data': forms.ClearableFileInput(attrs={'multiple': True}),
+        }
 
     def clean_raw_data(self):
         raw_data = self.cleaned_data.get('raw_data')
-        content = raw_data.read().decode()
-        has_cr = re.search(r'^CR', content, re.MULTILINE) is not None
-        has_er = re.search(r'^ER$', content), re.MULTILINE is not None
-        if not has_cr or not has_er:
+        formats = set()
+        for upload in self.files.getlist('raw_data'):
+            file_format = sniff_format(read_head(upload.file))
+            if file_format is None:
+                raise forms.ValidationError(
+                    'Your file format is not supported, upload Web of '
+                    'Science or Scopus exports.',
+                    code='bad-format'
+                )
+            formats.add(file_format)
+            # Compressed uploads are validated, and kept, compressed, only
+            # their head is decompressed, undecodable bytes are dropped
+            content = read_head(upload.file, REFERENCE_HEAD_SIZE)
+            for pattern in REFERENCE_PATTERNS[file_format]:
+                if re.search(pattern, content, re.MULTILINE) is None:
+                    raise forms.ValidationError(
+                        'Your file does not include cited references, make '
+                        'sure you download the references in the right '
+                        'format.',
+                        code='bad-file'
+                    )
+        if len(formats) > 1:
             raise forms.ValidationError(
-                'Your file does not include cited references, make sure you '
-                'download the references in the right format.',
-                code='bad-file'
+                'All your files must be exported in the same format.',
+                code='mixed-formats'
             )
         return raw_data
 
+    def save(self, commit=True):
+        extra_uploads = self.files.getlist('raw_data')[:-1]
+        # The tree of several files is built once they are all saved, not
+        # when the query is
+        self.instance.defer_build = bool(extra_uploads)
+        if not commit or not extra_uploads:
+            return super().save(commit=commit)
+
+        with transaction.atomic():
+            query = super().save(commit=commit)
+            # The file widget keeps the last upload, the rest go aside
+            for upload in extra_uploads:
+                QueryFile.objects.create(query=query, raw_data=upload)
+        # Dispatched as the post_save handler does for single files
+        build_tree.apply_async((query.pk, ), countdown=5)
+        return query
+
 
 class InvitationForm(forms.ModelForm):
 
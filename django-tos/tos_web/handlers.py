@@ -27,6 +27,7 @@ def throw_task_to_build_tree(sender, created, instance, *args, **kwargs):
     This signal is execute for begin job to building tree after
     that a user make upload file
     '''
-    if created:
-        # Call task for build tree on Celery queue
+    if created and not getattr(instance, 'defer_build', False):
+        # Call task for build tree on Celery queue, queries of several
+        # files are dispatched by their form once every file is saved
         build_tree.apply_async((instance.pk, ), countdown=5)
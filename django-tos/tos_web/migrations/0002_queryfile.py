@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+import tos_web.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tos_web', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueryFile',
+            fields=[
+                ('id', models.AutoField(serialize=False, verbose_name='ID', primary_key=True, auto_created=True)),
+                ('raw_data', models.FileField(upload_to=tos_web.models.Query.rename_file)),
+                ('query', models.ForeignKey(to='tos_web.Query', related_name='files')),
+            ],
+        ),
+    ]
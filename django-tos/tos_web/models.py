@@ -5,6 +5,8 @@ from django.db import models
 from django.contrib.auth.models import AbstractBaseUser
 from django.contrib.auth.models import BaseUserManager
 
+COMPRESSED_EXTENSIONS = ('.gz', '.bz2', '.xz', '.zip')
+
 STATE_SYSTEM = (
     ('AC', 'Active'),
     ('PD', 'Pending'),
@@ -126,9 +128,13 @@ class Query(models.Model):
     '''
     def rename_file(instance, filename):
         '''
-        Rename the file when the user make upload
+        Rename the file when the user make upload, compressed uploads keep
+        their extension
         '''
-        filename = '%s.%s' % (uuid.uuid4(), 'txt')
+        extension = os.path.splitext(filename)[1].lower()
+        if extension not in COMPRESSED_EXTENSIONS:
+            extension = '.txt'
+        filename = '%s%s' % (uuid.uuid4(), extension)
         return os.path.join('raw', filename)
 
     user = models.ForeignKey(
@@ -143,3 +149,13 @@ class Query(models.Model):
     def ready(self):
         "Is the query ready for deploy?"
         return not self.tree == b''
+
+
+class QueryFile(models.Model):
+
+    '''
+    Additional export file of a query, large searches are downloaded from
+    Web of Science as several files.
+    '''
+    query = models.ForeignKey(Query, related_name='files')
+    raw_data = models.FileField(upload_to=Query.rename_file)
@@ -11,7 +11,8 @@ from celery import shared_task
 from pusher import Pusher
 
 from tos.graph.tree_of_science import TreeOfScience
-from tos.interpreters import IsiInterpreter
+from tos.interpreters import detect_interpreter
+from tos.interpreters.cache import CorpusCache
 
 from .models import Query
 
@@ -119,10 +120,17 @@ def build_tree(self, pk):
     '''
 
     query = Query.objects.get(pk=pk)
-    path = os.path.join(settings.MEDIA_ROOT,
-                        query.raw_data.path)
-    handle = open(path, 'r')
-    tree = TreeOfScience(IsiInterpreter(), {'data': handle.read()})
+    paths = [
+        os.path.join(settings.MEDIA_ROOT, raw_data.path)
+        for raw_data in [query.raw_data] + [
+            query_file.raw_data for query_file in query.files.order_by('pk')
+        ]
+    ]
+    # Uploads share a format, checked by the query form
+    tree = TreeOfScience(detect_interpreter(paths[0]), {
+        'files': paths,
+        'cache': CorpusCache(settings.TOS_CACHE_DIR, settings.TOS_CACHE_SIZE),
+    })
     query.tree = pickle.dumps(tree)
     query.save()
 
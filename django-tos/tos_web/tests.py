@@ -1,3 +1,4 @@
+import gzip
 import json
 import os
 
@@ -6,12 +7,15 @@ from unittest.mock import patch
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.files import File
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.urlresolvers import reverse
 
 from django.test import TestCase
+from django.test import override_settings
 
 from .models import Invitation
 from .models import Query
+from .models import QueryFile
 from .models import Verification
 
 
@@ -186,6 +190,73 @@ class QueryResourceTest(TosWebTestCase):
         self.assertRedirects(response, reverse('queries'))
         self.assertEqual(old_count + 1, Query.objects.count())
 
+    def test_query_create_accepts_several_files(self):
+        self.loginUser()
+        old_count = QueryFile.objects.count()
+        with open(self.filename, 'rb') as first, \
+                open(self.filename, 'rb') as second:
+            response = self.client.post(reverse('queries-create'), {
+                'description': 'alsdkfjalskdjf',
+                'raw_data': [first, second],
+            })
+        self.assertRedirects(response, reverse('queries'))
+        query = Query.objects.latest(field_name='pk')
+        self.assertEqual(old_count + 1, QueryFile.objects.count())
+        self.assertEqual(1, query.files.count())
+
+    def test_query_create_keeps_compressed_files(self):
+        self.loginUser()
+        with open(self.filename, 'rb') as handle:
+            upload = SimpleUploadedFile('isi.txt.gz',
+                                        gzip.compress(handle.read()))
+        response = self.client.post(reverse('queries-create'), {
+            'description': 'alsdkfjalskdjf',
+            'raw_data': upload,
+        })
+        self.assertRedirects(response, reverse('queries'))
+        query = Query.objects.latest(field_name='pk')
+        self.assertTrue(query.raw_data.name.endswith('.gz'))
+
+    def test_query_create_accepts_files_not_in_utf8(self):
+        self.loginUser()
+        with open(self.filename, 'rb') as handle:
+            content = handle.read().replace(b'TI ', b'TI Caf\xe9 ', 1)
+        response = self.client.post(reverse('queries-create'), {
+            'description': 'alsdkfjalskdjf',
+            'raw_data': SimpleUploadedFile('isi.txt', content),
+        })
+        self.assertRedirects(response, reverse('queries'))
+
+    @override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=0)
+    def test_query_create_accepts_references_after_the_first_buffer(self):
+        # Uploads are stored on disk, the first cited reference comes well
+        # after the buffer of the temporary file
+        self.loginUser()
+        with open(self.filename, 'rb') as handle:
+            content = handle.read().replace(
+                b'\nPT J\n', b'\nPT J\nAB ' + b'Long abstract. ' * 1000 +
+                b'\n', 1)
+        self.assertGreater(content.index(b'\nCR '), 8192)
+        old_count = Query.objects.count()
+        response = self.client.post(reverse('queries-create'), {
+            'description': 'alsdkfjalskdjf',
+            'raw_data': SimpleUploadedFile('isi.txt', content),
+        })
+        self.assertRedirects(response, reverse('queries'))
+        self.assertEqual(old_count + 1, Query.objects.count())
+
+    def test_query_create_rejects_unknown_formats(self):
+        self.loginUser()
+        old_count = Query.objects.count()
+        upload = SimpleUploadedFile('notes.txt', b'Some notes, no records')
+        response = self.client.post(reverse('queries-create'), {
+            'description': 'alsdkfjalskdjf',
+            'raw_data': upload,
+        })
+        self.assertEqual(200, response.status_code)
+        self.assertIn('raw_data', response.context['form'].errors)
+        self.assertEqual(old_count, Query.objects.count())
+
     @patch('tos_web.tasks.build_tree.apply_async')
     def test_query_create_disipates_build_tree_task(self, mock):
         self.loginUser()
@@ -198,6 +269,22 @@ class QueryResourceTest(TosWebTestCase):
             self.assertCalledOnce(mock)
             mock.assert_called_with((query.pk, ), countdown=5)
 
+    @patch('tos_web.tasks.build_tree.apply_async')
+    def test_query_create_builds_several_files_once_saved(self, apply_async):
+        self.loginUser()
+        saved_files = []
+        apply_async.side_effect = lambda args, countdown: saved_files.append(
+            Query.objects.get(pk=args[0]).files.count())
+        with open(self.filename, 'rb') as first, \
+                open(self.filename, 'rb') as second:
+            self.client.post(reverse('queries-create'), {
+                'description': 'alsdkfjalskdjf',
+                'raw_data': [first, second],
+            })
+        query = Query.objects.latest(field_name='pk')
+        apply_async.assert_called_once_with((query.pk, ), countdown=5)
+        self.assertEqual([1], saved_files)
+
     def test_queries_receive_a_proper_tree_at_some_point(self):
         user = self.loginUser()
         with open(self.filename, 'rb') as handle:
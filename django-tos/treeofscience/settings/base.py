@@ -89,4 +89,9 @@ MEDIA_ROOT = os.path.join(BASE_DIR, os.path.pardir, 'public', 'media')
 
 MEDIA_URL = '/media/'
 
+# Parsed corpora are cached by content, so rebuilding a tree skips parsing
+TOS_CACHE_DIR = os.path.join(BASE_DIR, os.path.pardir, 'public', 'cache')
+
+TOS_CACHE_SIZE = 2 * 1024 ** 3
+
 AUTH_USER_MODEL = 'tos_web.UserProfile'
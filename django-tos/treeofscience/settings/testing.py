@@ -1,3 +1,5 @@
+import tempfile
+
 from .base import *
 
 DEBUG = True
@@ -16,3 +18,5 @@ DATABASES = {
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
     }
 }
+
+TOS_CACHE_DIR = tempfile.mkdtemp()
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+"""
+Similarity calls, pairs pruned and wall time of
+:func:`~tos.graph.utils.detect_duplicate_labels` for each way of choosing
+candidate pairs, on synthetic cited references written as in
+``synthetic.py``, some of them with variations.
+
+The baseline, the pairwise comparison of the labels sharing their first
+letters before candidates were indexed, is timed too, and the duplicates
+found by every mode are compared with its ones. The `prefix` mode compares
+the same pairs, it must find every duplicate the baseline finds, along
+with the ones chained to them through a third label, which the baseline
+misses as it compares each label only against the label it was merged
+into. Note that both pair quadratically many labels, it takes minutes on
+100000 labels, hence the default of 10000.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Import the package of this checkout rather than an installed one
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+import jellyfish
+import synthetic
+
+from tos.graph.utils import detect_duplicate_labels
+
+
+def generate_labels(count, noise, seed):
+    rng = random.Random(seed)
+    sources = tuple(synthetic.build_sources(seed))
+    labels = set()
+    # Works are cited a few times each, with and without variations
+    while len(labels) < count:
+        work = synthetic.get_work(rng.randrange(count * 3 // 2), seed,
+                                  sources)
+        labels.add(synthetic.get_reference(work, rng, noise))
+    return sorted(labels)
+
+
+def baseline_duplicates(labels, similarity=jellyfish.jaro_winkler,
+                        shared_first_letters=2, threshold=0.96,
+                        inverted=False):
+    # detect_duplicate_labels as it was before candidates were indexed
+    sorted_labels = sorted(labels)
+    num_labels = len(sorted_labels)
+    duplicates = dict()
+
+    if inverted:
+        comp = lambda x, y: x < y
+    else:
+        comp = lambda x, y: x > y
+
+    for i in range(num_labels):
+        label = duplicates.get(sorted_labels[i], sorted_labels[i])
+        start_letters = label[:shared_first_letters]
+
+        for j in range(i + 1, num_labels):
+            other = sorted_labels[j]
+
+            if not other.startswith(start_letters):
+                break
+
+            sim = similarity(label, other)
+
+            if comp(sim, threshold):
+                duplicates[other] = label
+
+    return duplicates
+
+
+def check_duplicates(reference, duplicates):
+    # Every duplicate of the baseline is found, and the other ones match a
+    # label of their cluster sharing its first letters
+    assert set(reference) <= set(duplicates), 'baseline duplicates missed'
+    clusters = {}
+    for label, original in duplicates.items():
+        clusters.setdefault(original, [original]).append(label)
+    for members in clusters.values():
+        for label in members:
+            if label in reference or label == members[0]:
+                continue
+            assert any(
+                other != label and other[:2] == label[:2] and
+                jellyfish.jaro_winkler(label, other) > 0.96
+                for other in members
+            ), 'unexpected duplicate %r' % label
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--labels', type=int, nargs='+', default=[10000])
+    parser.add_argument('--noise', type=float, default=0.3,
+                        help='fraction of labels with a variation')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--candidates', nargs='+',
+                        default=['prefix', 'minhash', 'blocks'])
+    parser.add_argument('--workers', type=int, default=None,
+                        help='processes comparing the labels')
+    parser.add_argument('--exact-keys', action='store_true',
+                        help='merge labels sharing their DOI before '
+                             'comparing them')
+    parser.add_argument('--backend', default='auto',
+                        help='similarity backend, auto, python or rapidfuzz')
+    args = parser.parse_args()
+
+    for count in args.labels:
+        labels = generate_labels(count, args.noise, args.seed)
+
+        start = time.perf_counter()
+        reference = set(baseline_duplicates(labels))
+        seconds = time.perf_counter() - start
+        print('%-8s %8d labels %12s calls %12s pruned %9.2f s %7d duplicates'
+              % ('baseline', count, '-', '-', seconds, len(reference)),
+              flush=True)
+
+        for candidates in args.candidates:
+            stats = {}
+            start = time.perf_counter()
+            duplicates = detect_duplicate_labels(
+                labels, candidates=candidates, workers=args.workers,
+                exact_keys=args.exact_keys, stats=stats,
+                backend=args.backend)
+            seconds = time.perf_counter() - start
+
+            if candidates == 'prefix' and not args.exact_keys:
+                check_duplicates(reference, duplicates)
+            # Backends pruning while scoring do not count the pairs
+            pruned = '-' if stats['pruned'] is None else stats['pruned']
+            print('%-8s %8d labels %12d calls %12s pruned %9.2f s '
+                  '%7d duplicates %7d shared' % (
+                      candidates, count, stats['compared'], pruned,
+                      seconds, len(duplicates),
+                      len(reference.intersection(duplicates))), flush=True)
+
+
+if __name__ == '__main__':
+    main()
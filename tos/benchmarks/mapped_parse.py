@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+"""
+Time and peak of traced memory needed to parse a file read whole against
+:meth:`~tos.interpreters.isitxt.IsiInterpreter.iter_parse_mapped`.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Import the package of this checkout rather than an installed one
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from tos.interpreters import IsiInterpreter
+
+
+def measure(function):
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = sum(1 for entry in function())
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return count, seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('input', nargs='?', default='sample_data/isi.txt')
+    parser.add_argument('--copies', type=int, default=50,
+                        help='times the input entries are repeated')
+    args = parser.parse_args()
+
+    interpreter = IsiInterpreter()
+    data = open(args.input, 'r').read()
+    entries = data[:data.rindex(interpreter.entry_separator)]
+    data = interpreter.entry_separator.join([entries] * args.copies)
+    data += interpreter.entry_separator + 'EF'
+
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+        f.write(data)
+    del data, entries
+
+    cases = [
+        ('read', lambda: interpreter.parse(open(f.name, 'r').read())),
+        ('stream', lambda: interpreter.iter_parse(open(f.name, 'r'))),
+        ('mapped', lambda: interpreter.iter_parse_mapped(f.name)),
+    ]
+
+    try:
+        for name, function in cases:
+            count, seconds, peak = measure(function)
+            print('%-8s %8d entries %8.2f s %10.1f MiB peak' %
+                  (name, count, seconds, peak / 2 ** 20))
+    finally:
+        os.unlink(f.name)
+
+
+if __name__ == '__main__':
+    main()
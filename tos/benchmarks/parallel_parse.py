@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+"""
+Speedup of :meth:`~tos.interpreters.interpreter.BaseInterpreter.parse`
+and :meth:`~tos.interpreters.interpreter.BaseInterpreter.parse_corpus`
+for an increasing number of worker processes, against building the corpus
+in this process.
+
+Every copy of the input gets its own accession numbers so no record is
+dropped as a duplicate. The workers of `parse` send back whole entries,
+unpickling them and building the corpus takes longer than parsing the
+text, so it never beats a single process. The ones of `parse_corpus` send
+back the labels of each chunk once and the edges as arrays, splitting the
+text and merging the corpora keep about a quarter of the serial time in
+this process, so it wins from 2 cpus on, e.g. on the default 50050
+records.
+"""
+
+import argparse
+import itertools
+import os
+import re
+import sys
+import time
+
+# Import the package of this checkout rather than an installed one
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from tos.interpreters import IsiInterpreter
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('input', nargs='?', default='sample_data/isi.txt')
+    parser.add_argument('--copies', type=int, default=650,
+                        help='times the input entries are repeated')
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=[2, 4, 8, 16, 32])
+    args = parser.parse_args()
+
+    interpreter = IsiInterpreter()
+    data = open(args.input, 'r').read()
+    entries = data[:data.rindex(interpreter.entry_separator)]
+    data = interpreter.entry_separator.join([entries] * args.copies)
+    data += interpreter.entry_separator + 'EF'
+    numbers = itertools.count()
+    data = re.sub(r'^UT (.*)$',
+                  lambda match: 'UT %s-%d' % (match.group(1), next(numbers)),
+                  data, flags=re.MULTILINE)
+
+    start = time.perf_counter()
+    corpus = interpreter.build_corpus(interpreter.parse(data))
+    baseline = time.perf_counter() - start
+    print('%-6s %3d workers %8d records %8.2f s' %
+          ('serial', 1, len(corpus.records), baseline))
+
+    cpus = os.cpu_count()
+
+    for workers in args.workers:
+        if workers > cpus:
+            print('skipping %d workers, only %d cpus' % (workers, cpus))
+            continue
+        for name, build in [
+                ('parse', lambda: interpreter.build_corpus(
+                    interpreter.parse(data, workers=workers))),
+                ('corpus', lambda: interpreter.parse_corpus(
+                    data, workers=workers))]:
+            start = time.perf_counter()
+            parallel = build()
+            seconds = time.perf_counter() - start
+            assert parallel.sources == corpus.sources
+            print('%-6s %3d workers %8d records %8.2f s  speedup %5.2f' %
+                  (name, workers, len(parallel.records), seconds,
+                   baseline / seconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+"""
+Throughput of :meth:`~tos.interpreters.isitxt.IsiInterpreter.parse_entry`
+compared with the former regex based implementation, which matched the
+tag regex twice per line and zipped every entry with a shifted copy, both
+keeping every section and keeping only the label fields.
+"""
+
+import argparse
+import os
+import re
+import sys
+import timeit
+
+from collections import OrderedDict
+
+# Import the package of this checkout rather than an installed one
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from tos.interpreters import IsiInterpreter
+
+
+HEAD_LINE = re.compile(r'(?P<head>[A-Z0-9]{2})\s(?P<line>.+)')
+
+
+def regex_parse_entry(txt):
+    lines = txt.split('\n')
+    data = OrderedDict()
+    section = "UNKW"
+
+    for line, next in zip(lines, lines[1:] + ['']):
+        match_line = HEAD_LINE.match(line)
+        match_next = HEAD_LINE.match(next)
+        if match_line is not None:
+            section = match_line.group('head')
+            if match_next is not None or next == '':
+                data[section] = match_line.group('line')
+            else:
+                data[section] = [match_line.group('line')]
+        else:
+            if section in data:
+                data[section].append(line.strip())
+            else:
+                data[section] = [line.strip()]
+
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('input', nargs='?', default='sample_data/isi.txt')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    interpreter = IsiInterpreter(fields=None)
+    entries = interpreter.split_entries(open(args.input, 'r').read())
+    assert list(map(regex_parse_entry, entries)) == \
+        list(map(interpreter.parse_entry, entries))
+
+    for name, function in [('regex', regex_parse_entry),
+                           ('one pass', interpreter.parse_entry),
+                           ('projected', IsiInterpreter().parse_entry)]:
+        seconds = min(timeit.repeat(lambda: list(map(function, entries)),
+                                    number=10, repeat=args.repeat)) / 10
+        print('%-10s %10.0f entries/s' % (name, len(entries) / seconds))
+
+
+if __name__ == '__main__':
+    main()
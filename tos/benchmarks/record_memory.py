@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+"""
+Memory taken by the parsed entries as dictionaries of every section, as
+dictionaries of the label fields and as
+:class:`~tos.interpreters.isitxt.IsiRecord` instances.
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+# Import the package of this checkout rather than an installed one
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from tos.interpreters import IsiInterpreter
+
+
+def measure(interpreter, data):
+    gc.collect()
+    tracemalloc.start()
+    entries = interpreter.parse(data)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return len(entries), size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('input', nargs='?', default='sample_data/isi.txt')
+    parser.add_argument('--copies', type=int, default=20,
+                        help='times the input entries are repeated')
+    args = parser.parse_args()
+
+    interpreter = IsiInterpreter()
+    data = open(args.input, 'r').read()
+    entries = data[:data.rindex(interpreter.entry_separator)]
+    data = interpreter.entry_separator.join([entries] * args.copies)
+    data += interpreter.entry_separator + 'EF'
+
+    cases = [
+        ('dict', IsiInterpreter(fields=None)),
+        ('fields', IsiInterpreter()),
+        ('record', IsiInterpreter(compact=True)),
+    ]
+
+    for name, interpreter in cases:
+        count, size = measure(interpreter, data)
+        print('%-8s %8d entries %10.1f MiB %8.0f bytes/entry' %
+              (name, count, size / 2 ** 20, size / count))
+
+
+if __name__ == '__main__':
+    main()
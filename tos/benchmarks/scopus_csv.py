@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+"""
+Throughput of :class:`~tos.interpreters.scopustxt.ScopusCsvInterpreter`
+against :class:`~tos.interpreters.isitxt.IsiInterpreter` on the same
+records, the isi input is written as a scopus export first.
+
+Copies of the input records get accession numbers of their own, so neither
+interpreter drops them as duplicates, and both corpora are checked to hold
+the same entries and edges before timing.
+"""
+
+import argparse
+import csv
+import io
+import os
+import re
+import sys
+import time
+
+# Import the package of this checkout rather than an installed one
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from tos.interpreters import IsiInterpreter
+from tos.interpreters import ScopusCsvInterpreter
+
+
+def as_list(value):
+    return [value] if isinstance(value, str) else value
+
+
+def scopus_reference(reference):
+    # Smith J, 2001, NATURE, V410, P100 -> Smith J., Title (2001) NATURE...
+    parts = reference.split(', ')
+    volume = [part[1:] for part in parts if part.startswith('V')]
+    page = [part[1:] for part in parts if part.startswith('P')]
+    return '%s., Title (%s) %s, %s, pp. %s-1.' % (
+        parts[0], parts[1] if len(parts) > 1 else '',
+        parts[2] if len(parts) > 2 else '',
+        volume[0] if volume else '', page[0] if page else '')
+
+
+def to_scopus(entries):
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(['Authors', 'Title', 'Year', 'Source title', 'Volume',
+                     'Page start', 'DOI', 'References', 'EID'])
+    for number, entry in enumerate(entries):
+        writer.writerow([
+            ', '.join(author.replace(',', '') + '.'
+                      for author in as_list(entry['AU'])),
+            'Title', entry.get('PY', ''), entry.get('J9', ''),
+            entry.get('VL', ''), entry.get('BP', ''), entry.get('DI', ''),
+            '; '.join(map(scopus_reference, as_list(entry.get('CR', [])))),
+            '2-s2.0-%d' % (number, ),
+        ])
+    return output.getvalue()
+
+
+def build(interpreter, data):
+    return interpreter.build_corpus(interpreter.iter_parse(io.StringIO(data)))
+
+
+def measure(interpreter, data):
+    start = time.perf_counter()
+    build(interpreter, data)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('input', nargs='?', default='sample_data/isi.txt')
+    parser.add_argument('--copies', type=int, default=20,
+                        help='times the input entries are repeated')
+    args = parser.parse_args()
+
+    isi = IsiInterpreter()
+    data = open(args.input, 'r').read()
+    entries = data[:data.rindex(isi.entry_separator)]
+    # Every copy is a record of its own
+    isi_data = isi.entry_separator.join(
+        re.sub(r'^UT (.*)$', r'UT \1-%d' % (copy, ), entries,
+               flags=re.MULTILINE)
+        for copy in range(args.copies)
+    )
+    isi_data += isi.entry_separator + 'EF'
+    scopus_data = to_scopus(isi.parse(isi_data))
+    scopus = ScopusCsvInterpreter()
+
+    isi_corpus = build(isi, isi_data)
+    scopus_corpus = build(scopus, scopus_data)
+    count = len(isi_corpus.records)
+    edges = len(isi_corpus.sources)
+    assert count == len(scopus_corpus.records), 'entry counts differ'
+    assert edges == len(scopus_corpus.sources), 'edge counts differ'
+
+    for name, interpreter, data in [('isi', isi, isi_data),
+                                    ('scopus', scopus, scopus_data)]:
+        seconds = measure(interpreter, data)
+        print('%-8s %8d entries %8d edges %10.0f entries/s' %
+              (name, count, edges, count / seconds))
+
+
+if __name__ == '__main__':
+    main()
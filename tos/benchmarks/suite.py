@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+
+"""
+Records per second and peak resident memory of
+:meth:`~tos.interpreters.isitxt.IsiInterpreter.parse` and of a whole
+:class:`~tos.graph.tree_of_science.TreeOfScience` build on synthetic
+corpora of several sizes, see ``synthetic.py``.
+
+Every measure runs in a process of its own, so peak memory is not shared,
+and the results are saved as JSON, along with the commit they were measured
+at, in order to compare versions::
+
+    python benchmarks/suite.py --output before.json
+    git checkout other-version
+    python benchmarks/suite.py --output after.json --compare before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+# Import the package of this checkout rather than an installed one
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+import synthetic
+
+BENCHMARKS = ('parse', 'tree')
+
+
+def measure(benchmark, path):
+    from tos.graph.tree_of_science import TreeOfScience
+    from tos.interpreters import IsiInterpreter
+
+    start = time.perf_counter()
+    if benchmark == 'parse':
+        with open(path, 'r') as handler:
+            IsiInterpreter().parse(handler.read())
+    else:
+        TreeOfScience(IsiInterpreter(), {'path': path})
+    seconds = time.perf_counter() - start
+
+    # Linux reports kibibytes, macOS bytes
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss *= 1 if sys.platform == 'darwin' else 1024
+    return {'seconds': seconds, 'peak_rss_mib': rss / 2 ** 20}
+
+
+def run(benchmark, path, records):
+    output = subprocess.check_output([
+        sys.executable, os.path.abspath(__file__),
+        '--measure', benchmark, path,
+    ])
+    result = json.loads(output.decode())
+    result.update({
+        'benchmark': benchmark,
+        'records': records,
+        'records_per_second': records / result['seconds'],
+    })
+    return result
+
+
+def get_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, previous):
+    before = {(result['benchmark'], result['records']): result
+              for result in previous['results']}
+    print('\ncompared with %s' % previous.get('commit'))
+    for result in results:
+        old = before.get((result['benchmark'], result['records']))
+        if old is None:
+            continue
+        print('%-6s %9d records %7.2fx speed %7.2fx memory' % (
+            result['benchmark'], result['records'],
+            result['records_per_second'] / old['records_per_second'],
+            result['peak_rss_mib'] / old['peak_rss_mib']))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[1000, 10000, 100000],
+                        help='number of records of the corpora')
+    parser.add_argument('--references', type=int, default=30)
+    parser.add_argument('--noise', type=float, default=0.1)
+    parser.add_argument('--skew', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tree-limit', type=int, default=10000,
+                        help='largest corpus the tree is built for')
+    parser.add_argument('--directory', default=tempfile.gettempdir(),
+                        help='where the corpora are written and reused')
+    parser.add_argument('--output', default='benchmark.json')
+    parser.add_argument('--compare', help='results of a previous run')
+    parser.add_argument('--measure', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure is not None:
+        print(json.dumps(measure(*args.measure)))
+        return
+
+    parameters = {
+        'references': args.references, 'noise': args.noise,
+        'skew': args.skew, 'seed': args.seed,
+    }
+    results = []
+
+    for records in args.sizes:
+        path = os.path.join(args.directory, 'tos-synthetic-%d-%s.txt' % (
+            records, '-'.join(str(parameters[key])
+                              for key in sorted(parameters))))
+        if not os.path.exists(path):
+            with open(path + '.tmp', 'w') as handler:
+                synthetic.generate(handler, records, **parameters)
+            os.replace(path + '.tmp', path)
+
+        for benchmark in BENCHMARKS:
+            if benchmark == 'tree' and records > args.tree_limit:
+                continue
+            result = run(benchmark, path, records)
+            results.append(result)
+            print('%-6s %9d records %10.0f records/s %9.1f MiB' % (
+                benchmark, records, result['records_per_second'],
+                result['peak_rss_mib']))
+
+    report = {
+        'commit': get_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': parameters,
+        'results': results,
+    }
+    with open(args.output, 'w') as handler:
+        json.dump(report, handler, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare, 'r') as handler:
+            compare(results, json.load(handler))
+
+
+if __name__ == '__main__':
+    main()
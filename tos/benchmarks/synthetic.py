@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+
+"""
+Writes synthetic isi web of knowledge exports, modeled on
+``test/test_data/artificial_isi.txt``, in order to benchmark the library at
+any size.
+
+Records cite works drawn from a pool whose popularity follows a power law,
+`--skew` being its exponent, and the records themselves are part of the
+pool so they cite each other. A fraction `--noise` of the cited references
+is written with the variations found in real exports: missing DOI, missing
+initials, misspelled source or a page with a letter.
+"""
+
+import argparse
+import bisect
+import functools
+import itertools
+import os
+import random
+import string
+import sys
+
+# Import the package of this checkout rather than an installed one
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from tos.interpreters.labels import format_label
+
+SYLLABLES = ['ba', 'ri', 'lo', 'men', 'dez', 'sa', 'to', 'gar', 'cia', 'ro',
+             'dri', 'guez', 'mar', 'tin', 'lo', 'pez', 'her', 'nan', 'go',
+             'mez', 'va', 'le', 'ra', 'ca', 'stro', 'pe', 'rei', 'sil', 'du']
+
+WORDS = ['ANALYSIS', 'SCIENCE', 'JOURNAL', 'REVIEW', 'CHEMISTRY', 'PHYSICS',
+         'BIOLOGY', 'FOOD', 'PLANT', 'ECOLOGY', 'MEDICINE', 'APPLIED',
+         'INTERNATIONAL', 'RESEARCH', 'LETTERS', 'ENGINEERING', 'SYSTEMS',
+         'MOLECULAR', 'CELL', 'ENVIRONMENTAL', 'AGRICULTURAL', 'METHODS']
+
+ABSTRACT = ('This paper describes a synthetic study generated in order to '
+            'measure how the parser scales with the size of the corpus. ' * 6)
+
+
+_MASK = (1 << 64) - 1
+
+
+def _mix(value):
+    # Finalizer of splitmix64, spreads consecutive integers over 64 bits
+    value = (value + 0x9E3779B97F4A7C15) & _MASK
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK
+    return value ^ (value >> 31)
+
+
+def build_sources(seed, count=200):
+    rng = random.Random(seed)
+    sources = set()
+    while len(sources) < count:
+        sources.add(' '.join(
+            rng.choice(WORDS)[:rng.randint(4, 8)]
+            for _ in range(rng.randint(1, 4))
+        ))
+    return sorted(sources)
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def get_work(index, seed, sources):
+    """Returns the fields of a work, computed out of its index so works are
+    never held in memory
+
+    :returns: surname, initials, year, source, volume, page and DOI
+    :rtype: tuple
+    """
+    key = seed << 40 ^ index
+    bits = _mix(key) | _mix(key ^ _MASK) << 64
+
+    bits, length = divmod(bits, 3)
+    syllables = []
+    for _ in range(length + 2):
+        bits, syllable = divmod(bits, len(SYLLABLES))
+        syllables.append(SYLLABLES[syllable])
+    bits, first = divmod(bits, 26)
+    bits, second = divmod(bits, 27)
+    initials = string.ascii_uppercase[first] + ' ABCDEFGHIJKLMNOPQRSTUVWXYZ'[
+        second].strip()
+    bits, year = divmod(bits, 67)
+    bits, source = divmod(bits, len(sources))
+    bits, volume = divmod(bits, 400)
+    bits, page = divmod(bits, 3000)
+    bits, has_doi = divmod(bits, 10)
+    bits, prefix = divmod(bits, 9000)
+    doi = '10.%d/synthetic.%d' % (prefix + 1000, index) if has_doi < 7 else ''
+
+    return (''.join(syllables).capitalize(), initials, str(1950 + year),
+            sources[source], str(volume + 1), str(page + 1), doi)
+
+
+def get_reference(work, rng, noise):
+    """Returns the label of a work, with a variation with probability
+    `noise`
+    """
+    surname, initials, year, source, volume, page, doi = work
+    if rng.random() < noise:
+        variation = rng.randrange(4)
+        if variation == 0:
+            doi = ''
+        elif variation == 1:
+            initials = initials[:-1]
+        elif variation == 2:
+            position = rng.randrange(len(source))
+            source = source[:position] + source[position + 1:]
+        else:
+            page = 'e' + page
+    return format_label(surname + (' ' + initials if initials else ''),
+                        year, source, volume, page, doi)
+
+
+def write_record(handler, work, references, index):
+    surname, initials, year, source, volume, page, doi = work
+    handler.write('PT J\n')
+    handler.write('AU %s, %s\n   Coauthor, A\n' % (surname, initials))
+    handler.write('AF %s, %s.\n   Coauthor, Anne\n' % (surname, initials))
+    handler.write('TI Synthetic record number %d of the benchmark\n   '
+                  'corpus\n' % index)
+    handler.write('SO %s\nLA English\nDT Article\n' % source)
+    handler.write('AB %s\n' % ABSTRACT)
+    handler.write('CR %s\n' % '\n   '.join(references))
+    handler.write('NR %d\nTC 0\nZ9 0\n' % len(references))
+    handler.write('J9 %s\nPY %s\nVL %s\nBP %s\n' % (
+        source, year, volume, page))
+    if doi:
+        handler.write('DI %s\n' % doi)
+    handler.write('UT WOS:%015d\nER\n\n' % index)
+
+
+def generate(handler, records, references=30, noise=0.1, skew=1.0,
+             pool=3, seed=0):
+    """Writes a synthetic export with `records` records
+
+    :param handler: text handler the export is written to
+    :param int records: number of records
+    :param int references: mean number of references per record
+    :param float noise: fraction of references written with a variation
+    :param float skew: exponent of the power law of the citations
+    :param int pool: number of cited works per record
+    :param int seed: seed of the random generator
+    """
+    rng = random.Random(seed)
+    sources = tuple(build_sources(seed))
+    count = records * pool
+    # Works are ranked by popularity, records are spread among them
+    weights = list(itertools.accumulate(
+        1.0 / (rank + 1) ** skew for rank in range(count)))
+    total = weights[-1]
+
+    handler.write('FN Thomson Reuters Web of Science\u2122\nVR 1.0\n')
+    for index in range(records):
+        position = index * pool + rng.randrange(pool)
+        work = get_work(position, seed, sources)
+        cited = set()
+        for _ in range(rng.randint(references // 2, references * 3 // 2)):
+            cited.add(min(bisect.bisect(weights, rng.random() * total),
+                          count - 1))
+        cited.discard(position)
+        labels = [get_reference(get_work(position, seed, sources), rng, noise)
+                  for position in sorted(cited)]
+        write_record(handler, work, labels, index)
+    handler.write('EF')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('output')
+    parser.add_argument('--records', type=int, default=1000)
+    parser.add_argument('--references', type=int, default=30,
+                        help='mean number of references per record')
+    parser.add_argument('--noise', type=float, default=0.1,
+                        help='fraction of references with a variation')
+    parser.add_argument('--skew', type=float, default=1.0,
+                        help='exponent of the power law of the citations')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with open(args.output, 'w') as handler:
+        generate(handler, args.records, args.references, args.noise,
+                 args.skew, seed=args.seed)
+
+
+if __name__ == '__main__':
+    main()
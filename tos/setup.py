@@ -42,6 +42,9 @@ if __name__ == '__main__':
             'jellyfish>=0.3.2',
             'python-igraph>=0.7'
         ],
+        extras_require={
+            'rapidfuzz': ['rapidfuzz>=2.0'],
+        },
         tests_require=[
             'pytest>=2.6.2',
             'pytest-cov>=1.8.0',
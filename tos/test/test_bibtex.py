@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+"""
+Simple tests for the BibTeX interpreters.
+"""
+
+import io
+
+from tos.interpreters.bibtex import iter_bibtex_entries
+from tos.interpreters.bibtex import parse_bibtex_entry
+from tos.interpreters.isibib import IsiBibInterpreter
+from tos.interpreters.isibib import get_isi_author
+from tos.interpreters.scopusbib import ScopusBibInterpreter
+
+
+def test_iter_bibtex_entries():
+    txt = ('preamble @a{x, t = {{a}b}}\n\n@b{y,\n t = "c {d}",\n n = 3}\n'
+           'trailing text')
+    expected = ['@a{x, t = {{a}b}}', '@b{y,\n t = "c {d}",\n n = 3}']
+    for chunk_size in (1, 3, 65536):
+        handler = io.StringIO(txt)
+        assert(list(iter_bibtex_entries(handler, chunk_size)) == expected)
+
+
+def test_iter_bibtex_entries_special_blocks():
+    txt = ('@Comment{jabref-meta: {x}}\n@STRING{nat = "Nature"}\n'
+           '@preamble{"\\newcommand"}\n@a{x, t = {a}}\n@comment{last}\n')
+    for chunk_size in (1, 4, 65536):
+        handler = io.StringIO(txt)
+        assert(list(iter_bibtex_entries(handler, chunk_size)) ==
+               ['@a{x, t = {a}}'])
+
+
+def test_parse_bibtex_entry():
+    entry = parse_bibtex_entry('@Article{x,\n Title = {{A} \\& {B}},\n'
+                               ' Note = "c {d}", Year = 2014,\n}')
+    assert(entry == {'ENTRYTYPE': 'article', 'ID': 'x', 'title': 'A & B',
+                     'note': 'c d', 'year': '2014'})
+    entry = parse_bibtex_entry('@article{x, Title = {a}, Year = {b}}',
+                               fields={'year'})
+    assert(entry == {'ENTRYTYPE': 'article', 'ID': 'x', 'year': 'b'})
+
+
+def test_get_isi_author():
+    assert(get_isi_author('Pereira, Sara I.') == 'Pereira SI')
+    assert(get_isi_author('Durand, Jean-Pierre') == 'Durand JP')
+
+
+def test_isi_iter_parse():
+    isi_interpreter = IsiBibInterpreter()
+    handler = open('test/test_data/artificial_isi.bib', 'r')
+    entries = isi_interpreter.iter_parse(handler)
+    assert(not isinstance(entries, list))
+    entries = list(entries)
+    assert(len(entries) == 2)
+    assert('title' not in entries[0])
+    assert(isi_interpreter.get_entry_id(entries[1]) == 'ISI:000322530900060')
+
+
+def test_isi_labels():
+    isi_interpreter = IsiBibInterpreter()
+    handler = open('test/test_data/artificial_isi.bib', 'r')
+    entries = isi_interpreter.parse_file(handler)
+
+    assert(isi_interpreter.get_entry_label(entries[0]) ==
+           'Pereira SI, 2014, FOOD CHEM, V154, P291, '
+           'DOI 10.1016/j.foodchem.2014.01.019')
+    assert(isi_interpreter.get_entry_label(entries[1]) ==
+           'de Bekker C, 2013, PLOS ONE, V8, pE70609, '
+           'DOI 10.1371/journal.pone.0070609')
+    assert(isi_interpreter.get_referenced_labels(entries[0]) == [
+        'Abu-Reidah IM, 2013, J CHROMATOGR A, V1313, P212, '
+        'DOI 10.1016/j.chroma.2013.07.020',
+        'Ashraf M, 2007, ENVIRON EXP BOT, V59, P206, '
+        'DOI 10.1016/j.envexpbot.2005.12.006',
+        'Dias MC, 2014, NUTRIENTS, V2, P1, '
+        'DOI [10.3390/nu20100001, 10.3390/nu2010001]',
+    ])
+
+
+def test_isi_build_corpus():
+    isi_interpreter = IsiBibInterpreter()
+    handler = open('test/test_data/artificial_isi.bib', 'r')
+    corpus = isi_interpreter.build_corpus(isi_interpreter.iter_parse(handler))
+    assert(('de Bekker C, 2013, PLOS ONE, V8, pE70609, '
+            'DOI 10.1371/journal.pone.0070609',
+            'Pereira SI, 2014, FOOD CHEM, V154, P291, '
+            'DOI 10.1016/j.foodchem.2014.01.019') in corpus.edge_relations())
+
+
+def test_scopus_labels():
+    scopus_interpreter = ScopusBibInterpreter()
+    handler = open('test/test_data/artificial_scopus.bib', 'r')
+    entries = scopus_interpreter.parse_file(handler)
+
+    assert(len(entries) == 2)
+    assert(scopus_interpreter.get_entry_id(entries[0]) ==
+           '2-s2.0-84893832917')
+    assert(scopus_interpreter.get_entry_label(entries[0]) ==
+           'Pereira SI, 2014, FOOD CHEM, V154, P291, '
+           'DOI 10.1016/j.foodchem.2014.01.019')
+    assert(scopus_interpreter.get_entry_label(entries[1]) ==
+           'de Bekker C, 2013, PLOS ONE, V8, pE70609, '
+           'DOI 10.1371/journal.pone.0070609')
+    assert(scopus_interpreter.get_referenced_labels(entries[1]) == [
+        'Pereira SI, 2014, FOOD CHEM, V154, P291',
+        'Andersen SB, 2009, AM NAT, V174, P424',
+    ])
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+
+"""
+Simple tests for the CorpusCache class.
+"""
+
+import os
+import shutil
+import tempfile
+import time
+
+from tos.graph.tree_of_science import TreeOfScience
+from tos.interpreters import IsiInterpreter
+from tos.interpreters import ScopusCsvInterpreter
+from tos.interpreters.cache import CorpusCache
+from tos.interpreters.cache import corpus_key
+
+
+def test_corpus_key():
+    isi_interpreter = IsiInterpreter()
+    key = corpus_key(isi_interpreter, ['sample_data/isi.txt'])
+    data = open('sample_data/isi.txt', 'rb').read()
+    assert(key == corpus_key(isi_interpreter, [data]))
+    assert(key != corpus_key(isi_interpreter, [data + b'\n']))
+    assert(key != corpus_key(ScopusCsvInterpreter(), [data]))
+    isi_interpreter.version += 1
+    assert(key != corpus_key(isi_interpreter, [data]))
+    # Interpreters keeping other fields build other corpora
+    assert(key != corpus_key(IsiInterpreter(compact=True), [data]))
+    assert(key != corpus_key(IsiInterpreter(fields=['AU']), [data]))
+    assert(corpus_key(ScopusCsvInterpreter(), [data]) !=
+           corpus_key(ScopusCsvInterpreter(columns=['EID']), [data]))
+    assert(corpus_key(IsiInterpreter(fields=['AU', 'PY']), [data]) ==
+           corpus_key(IsiInterpreter(fields=['PY', 'AU']), [data]))
+
+
+def test_store_load():
+    isi_interpreter = IsiInterpreter()
+    directory = tempfile.mkdtemp()
+    try:
+        cache = CorpusCache(directory)
+        corpus = cache.build_corpus(isi_interpreter, ['sample_data/isi.txt'])
+        key = corpus_key(isi_interpreter, ['sample_data/isi.txt'])
+        loaded = cache.load(key)
+        assert(cache.load('missing') is None)
+    finally:
+        shutil.rmtree(directory)
+
+    assert(loaded.labels.labels == corpus.labels.labels)
+    assert(loaded.labels.identifiers == corpus.labels.identifiers)
+    assert(loaded.sources == corpus.sources)
+    assert(loaded.targets == corpus.targets)
+
+
+def test_load_corrupt():
+    isi_interpreter = IsiInterpreter()
+    corpus = isi_interpreter.build_corpus(
+        isi_interpreter.iter_parse_mapped('sample_data/isi.txt'))
+    directory = tempfile.mkdtemp()
+    try:
+        cache = CorpusCache(directory)
+        cache.store('a', corpus)
+        with open(cache.path('a'), 'rb') as handler:
+            data = handler.read()
+        for corrupt in [data[:len(data) // 2],
+                        data.replace(b'Nicholson', b'\xff\xfe\xfd\xfc\xfb'
+                                     b'\xfa\xf9\xf8\xf7')]:
+            with open(cache.path('a'), 'wb') as handler:
+                handler.write(corrupt)
+            assert(cache.load('a') is None)
+            assert(not os.path.exists(cache.path('a')))
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_evict():
+    isi_interpreter = IsiInterpreter()
+    corpus = isi_interpreter.build_corpus(
+        isi_interpreter.iter_parse_mapped('sample_data/isi.txt'))
+    directory = tempfile.mkdtemp()
+    try:
+        cache = CorpusCache(directory)
+        for age, key in [(20, 'a'), (10, 'b')]:
+            cache.store(key, corpus)
+            # Give every file its own modification time
+            os.utime(cache.path(key), (time.time() - age, ) * 2)
+        cache.max_size = 2 * os.path.getsize(cache.path('a'))
+        assert(cache.load('a') is not None)
+        cache.store('c', corpus)
+        kept = sorted(os.listdir(directory))
+    finally:
+        shutil.rmtree(directory)
+
+    assert(kept == ['a.corpus', 'c.corpus'])
+
+
+def test_build_corpus_appended_files():
+    isi_interpreter = IsiInterpreter()
+    data = open('sample_data/isi.txt', 'r').read()
+    entries = data[:data.rindex(isi_interpreter.entry_separator)].split(
+        isi_interpreter.entry_separator)
+    directory = tempfile.mkdtemp()
+    try:
+        paths = [os.path.join(directory, name) for name in ['a', 'b']]
+        with open(paths[0], 'w') as handler:
+            handler.write('\nER\n\n'.join(entries[:30]) + '\nER\n\nEF')
+        with open(paths[1], 'w') as handler:
+            handler.write('\nER\n\n'.join(entries[20:]) + '\nER\n\nEF')
+
+        cache = CorpusCache(os.path.join(directory, 'cache'))
+        whole = isi_interpreter.build_corpus(
+            isi_interpreter.iter_parse_files(paths))
+        cache.build_corpus(isi_interpreter, paths[:1])
+
+        parsed = []
+        iter_parse_files = isi_interpreter.iter_parse_files
+        isi_interpreter.iter_parse_files = lambda sources: (
+            parsed.extend(sources) or iter_parse_files(sources))
+        corpus = cache.build_corpus(isi_interpreter, paths)
+        loaded = cache.build_corpus(isi_interpreter, paths)
+
+        key, appended = cache.append(corpus_key(isi_interpreter, paths[:1]),
+                                     isi_interpreter, paths[1:])
+        assert(key == corpus_key(isi_interpreter, paths))
+    finally:
+        shutil.rmtree(directory)
+
+    # Only the appended file is parsed, by the first build and the append
+    assert(parsed == paths[1:] * 2)
+    for other in [corpus, loaded, appended]:
+        assert(other.labels.labels == whole.labels.labels)
+        assert(other.edge_relations() == whole.edge_relations())
+        assert(len(other.records) == len(entries))
+
+
+def test_tree_of_science_cache():
+    directory = tempfile.mkdtemp()
+    try:
+        first = TreeOfScience(IsiInterpreter(), {
+            'path': 'sample_data/isi.txt', 'cache': directory,
+        })
+        # A cached corpus is not parsed again
+        isi_interpreter = IsiInterpreter()
+        isi_interpreter.iter_parse_mapped = None
+        second = TreeOfScience(isi_interpreter, {
+            'path': 'sample_data/isi.txt', 'cache': CorpusCache(directory),
+        })
+    finally:
+        shutil.rmtree(directory)
+
+    assert(first.graph.vs['label'] == second.graph.vs['label'])
+    assert(first.graph.get_edgelist() == second.graph.get_edgelist())
+    # Caches are pickled as their directory
+    assert(second.__getstate__()['config']['cache'] == directory)
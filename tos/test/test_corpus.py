@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+"""
+Simple tests for the Corpus class.
+"""
+
+from tos.interpreters.corpus import Corpus
+
+
+def test_add():
+    corpus = Corpus()
+    corpus.add('a', ['b', 'c'])
+    corpus.add('b', ['c'])
+    corpus.add('d', [])
+    assert(list(corpus.labels) == ['a', 'b', 'c', 'd'])
+    assert(list(corpus.sources) == [0, 0, 1])
+    assert(list(corpus.targets) == [1, 2, 2])
+    assert(corpus.edge_relations() == [('a', 'b'), ('a', 'c'), ('b', 'c')])
+
+
+def test_build_corpus_append():
+    from tos.interpreters import IsiInterpreter
+
+    isi_interpreter = IsiInterpreter()
+    entries = isi_interpreter.parse_file(open('sample_data/isi.txt', 'r'))
+    whole = isi_interpreter.build_corpus(entries)
+    corpus = isi_interpreter.build_corpus(entries[:30])
+    appended = isi_interpreter.build_corpus(entries[20:], corpus)
+    assert(appended is corpus)
+    assert(len(corpus.records) == len(entries))
+    assert(corpus.labels.labels == whole.labels.labels)
+    assert(corpus.edge_relations() == whole.edge_relations())
+
+
+def test_fields():
+    corpus = Corpus()
+    corpus.add('Smith J, 2001, NATURE, V410, P100', [])
+    assert(corpus.fields.authors == ['Smith J'])
+    corpus.add('Doe J, 2003, SCIENCE, V1, P2', ['Smith J, 2001, NATURE'])
+    assert(corpus.fields.authors == ['Smith J', 'Doe J', 'Smith J'])
+    assert(list(corpus.fields.years) == [2001, 2003, 2001])
+
+
+def test_extend():
+    first = Corpus()
+    first.add('A', ['B', 'C'])
+    first.records.add('1')
+    second = Corpus()
+    second.add('D', ['C', 'A'])
+    second.records.add('2')
+    first.extend(second)
+    assert(first.edge_relations() == [('A', 'B'), ('A', 'C'), ('D', 'C'),
+                                      ('D', 'A')])
+    assert(first.labels.labels == ['A', 'B', 'C', 'D'])
+    assert(first.records == {'1', '2'})
@@ -4,6 +4,9 @@
 Simple graph utility tests.
 """
 
+import jellyfish
+import pytest
+
 import tos.graph.utils as utils
 from tos.graph.utils import extract_edge_relations
 from tos.graph.utils import detect_duplicate_labels
@@ -85,3 +88,182 @@ def test_patch_tuple_list():
     patched = utils.patch_tuple_list(items, patch)
     assert ('z', 'f') in patched
     assert ('c', 'w') in patched
+
+
+def test_renumber():
+    assert(list(utils.renumber([7, 3, 7, 9, 3])) == [0, 1, 0, 2, 1])
+
+
+def test_detect_duplicate_labels_minhash():
+    labels = [
+        'SMITH J, 2001, NATURE, V410, P100, DOI 10.1038/35065000',
+        'MSITH J, 2001, NATURE, V410, P100, DOI 10.1038/35065000',
+        'SMITH J, 2003, SCIENCE, V300, P12',
+    ]
+    duplicates = detect_duplicate_labels(labels, candidates='minhash',
+                                         exact_keys=False)
+    # The first letters differ, only the candidate index finds them
+    assert(detect_duplicate_labels(labels, exact_keys=False) == {})
+    assert(duplicates == {labels[0]: labels[1]})
+
+    isi_interpreter = IsiInterpreter()
+    handler = open('sample_data/isi.txt', 'r')
+    entries = isi_interpreter.parse_file(handler)
+    labels = isi_interpreter.get_label_list(entries)
+    duplicates = detect_duplicate_labels(labels, candidates='minhash')
+    assert(set(detect_duplicate_labels(labels)) <= set(duplicates))
+
+
+def test_detect_duplicate_labels_workers():
+    isi_interpreter = IsiInterpreter()
+    handler = open('sample_data/isi.txt', 'r')
+    entries = isi_interpreter.parse_file(handler)
+    labels = isi_interpreter.get_label_list(entries)
+    for candidates in ['prefix', 'minhash', 'blocks']:
+        serial = detect_duplicate_labels(labels, candidates=candidates)
+        parallel = detect_duplicate_labels(labels, candidates=candidates,
+                                           workers=2)
+        assert(serial and parallel == serial)
+
+
+def test_disjoint_set():
+    clusters = utils.DisjointSet(6)
+    clusters.union(4, 1)
+    clusters.union(5, 4)
+    clusters.union(2, 3)
+    assert(clusters.find(5) == clusters.find(1))
+    assert(clusters.find(2) != clusters.find(1))
+    assert(clusters.size(4) == 3)
+    assert(list(clusters.firsts()) == [0, 1, 2, 2, 1, 1])
+
+
+def test_detect_duplicate_labels_clusters():
+    # Chained duplicates end up in the same cluster, whatever the order
+    labels = ['3', '1', '2', '5']
+    similarity = lambda label, other: abs(int(label) - int(other)) == 1
+    duplicates = detect_duplicate_labels(labels, similarity=similarity,
+                                         shared_first_letters=0,
+                                         threshold=0.5)
+    assert(duplicates == {'2': '1', '3': '1'})
+    assert(utils.cluster_sizes(duplicates) == {3: 1})
+
+
+def test_detect_duplicate_labels_exact_keys():
+    labels = [
+        'Smith J, 2001, NATURE, V410, P100, DOI 10.1038/35065000',
+        'Smyth J, 2001, NATURE, V410, P100, DOI 10.1038/35065000',
+        'SMITH J., 2001, Nature, V410, P100',
+        'Smith J, 2001, NATURE, V410, P101',
+    ]
+    calls = []
+
+    def similarity(label, other):
+        calls.append((label, other))
+        return jellyfish.jaro_winkler(label, other)
+
+    duplicates = detect_duplicate_labels(labels, similarity=similarity,
+                                         shared_first_letters=1,
+                                         exact_keys=True)
+    assert(duplicates == {labels[0]: labels[2], labels[1]: labels[2]})
+    # Merged labels are compared no more
+    assert(len(calls) == 1)
+
+
+def test_detect_duplicate_labels_exact_keys_sources():
+    labels = [
+        'Smith J, 2001, NATURE, V10, P1',
+        'Smith J, 2001, SCIENCE, V10, P1',
+    ]
+    assert(detect_duplicate_labels(labels, similarity=lambda x, y: 0.0,
+                                   exact_keys=True) == {})
+
+
+def test_detect_duplicate_labels_exact_keys_different_dois():
+    labels = [
+        'Smith J, 2001, NATURE, V410, P100, DOI 10.1038/1',
+        'Smith J, 2001, NATURE, V410, P100, DOI 10.1038/2',
+        'Smith J, 2001, NATURE, V410, P100',
+    ]
+    duplicates = detect_duplicate_labels(labels, similarity=lambda x, y: 1.0,
+                                         threshold=0.5, exact_keys=True)
+    # The label without DOI is merged with one of them, not both
+    assert(duplicates == {labels[0]: labels[2]})
+
+
+def test_detect_duplicate_labels_blocks():
+    labels = [
+        'Smith J, 2001, NATURE, V410, P100',
+        'Smith J, 2002, NATURE, V410, P100',
+        'Smith J, 2004, NATURE, V410, P100',
+        'Smith JA, 2001, NATUR, V410, P100',
+        'Smyth J, 2001, NATURE, V410, P100',
+    ]
+    calls = []
+
+    def similarity(label, other):
+        calls.append((label, other))
+        return 1.0
+
+    detect_duplicate_labels(labels, similarity=similarity,
+                            candidates='blocks', exact_keys=False)
+    assert(sorted(calls) == [(labels[0], labels[1]), (labels[0], labels[3]),
+                             (labels[1], labels[3])])
+
+    del calls[:]
+    detect_duplicate_labels(labels, similarity=similarity,
+                            candidates='blocks', exact_keys=False,
+                            year_window=0, same_source=True)
+    assert(calls == [])
+
+    # Blocks hold whole surnames, particles included
+    labels = [
+        'DE SOUZA AB, 2001, NATURE, V410, P100',
+        'DESOUZA A, 2001, NATURE, V410, P100',
+        'DE LA CRUZ M, 2001, NATURE, V410, P100',
+        'VAN DIJK J, 2001, NATURE, V410, P100',
+        'Van Dijk J, 2001, NATURE, V410, P100',
+    ]
+    del calls[:]
+    detect_duplicate_labels(labels, similarity=similarity,
+                            candidates='blocks', exact_keys=False)
+    assert(sorted(calls) == [(labels[0], labels[1]), (labels[3], labels[4])])
+
+
+def test_detect_duplicate_labels_pruning():
+    labels = ['apple', 'apples', 'applesauce', 'aple', 'pale']
+    for similarity, threshold, inverted in [
+            (jellyfish.jaro_winkler, 0.9, False),
+            (jellyfish.levenshtein_distance, 2, True)]:
+        stats = {}
+        duplicates = detect_duplicate_labels(
+            labels, similarity=similarity, threshold=threshold,
+            inverted=inverted, shared_first_letters=0, exact_keys=False,
+            stats=stats, backend='python')
+        # Wrapped similarities are not known to be bounded
+        plain_stats = {}
+        plain = detect_duplicate_labels(
+            labels, similarity=lambda x, y: similarity(x, y),
+            threshold=threshold, inverted=inverted, shared_first_letters=0,
+            exact_keys=False, stats=plain_stats)
+        assert(duplicates == plain)
+        assert(stats['pruned'] > 0 and plain_stats['pruned'] == 0)
+        assert(stats['compared'] + stats['pruned'] ==
+               plain_stats['compared'] == 10)
+
+
+def test_sweep_duplicates():
+    isi_interpreter = IsiInterpreter()
+    handler = open('sample_data/isi.txt', 'r')
+    labels = isi_interpreter.get_label_list(isi_interpreter.parse_file(
+        handler))
+    sweep = utils.sweep_duplicates(labels, [0.9, 0.96], [2, 3])
+    for (threshold, letters), duplicates in sweep.items():
+        assert(duplicates == detect_duplicate_labels(
+            labels, threshold=threshold, shared_first_letters=letters))
+    assert(len(sweep[0.9, 2]) > len(sweep[0.96, 2]))
+
+    table = utils.score_pairs(labels, threshold=0.96)
+    assert(len(table) and min(table.scores) > 0.96)
+    for threshold, letters in [(0.9, 2), (0.96, 1)]:
+        with pytest.raises(ValueError):
+            table.duplicates(threshold, letters)
@@ -7,8 +7,13 @@ Simple tests for the Interpreter class.
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import io
+
+import pytest
+
+from tos.interpreters.interpreter import iter_split
 from tos.interpreters.isitxt import IsiInterpreter
-# import pytest
+from tos.interpreters.isitxt import IsiRecord
 # from pprint import pprint
 
 
@@ -42,6 +47,49 @@ def test_parse_entry():
         check_entry(entry)
 
 
+def test_parse_entry_golden():
+    import json
+    from collections import OrderedDict
+
+    isi_interpreter = IsiInterpreter(fields=None)
+    handler = open('test/test_data/artificial_isi.txt', 'r')
+    golden = json.load(open('test/test_data/artificial_isi.json', 'r'),
+                       object_pairs_hook=OrderedDict)
+    entries = isi_interpreter.parse_file(handler)
+    assert(entries == golden)
+    for entry, expected in zip(entries, golden):
+        assert(list(entry.items()) == list(expected.items()))
+
+
+def test_parse_entry_continuation():
+    isi_interpreter = IsiInterpreter(fields=None)
+    entry = isi_interpreter.parse_entry(
+        'junk\nAU Doe, J\n   Roe, R\nPY 2001\nCR A\n   B\n   C\nXX \nDI x')
+    assert(entry['UNKW'] == ['junk'])
+    assert(entry['AU'] == ['Doe, J', 'Roe, R'])
+    assert(entry['PY'] == '2001')
+    assert(entry['CR'] == ['A', 'B', 'C', 'XX'])
+    assert(entry['DI'] == 'x')
+
+
+def test_parse_entry_fields():
+    isi_interpreter = IsiInterpreter(fields=['AU', 'CR'])
+    entry = isi_interpreter.parse_entry(
+        'AU Doe, J\n   Roe, R\nAB Long\n   abstract\nCR A\n   B')
+    assert(list(entry.items()) == [('AU', ['Doe, J', 'Roe, R']),
+                                   ('CR', ['A', 'B'])])
+
+
+def test_parse_fields_labels():
+    data = open('sample_data/isi.txt', 'r').read()
+    entries = IsiInterpreter(fields=None).parse(data)
+    projected = IsiInterpreter().parse(data)
+    assert('AB' in entries[0])
+    assert('AB' not in projected[0])
+    assert(IsiInterpreter().get_label_list(entries) ==
+           IsiInterpreter().get_label_list(projected))
+
+
 def test_parse():
     isi_interpreter = IsiInterpreter()
     data = open('sample_data/isi.txt', 'r').read()
@@ -65,6 +113,156 @@ def test_parse_parse_file_coherence():
     assert(isi_interpreter.parse(data) == isi_interpreter.parse_file(handler))
 
 
+def test_split_chunks():
+    isi_interpreter = IsiInterpreter()
+    data = open('sample_data/isi.txt', 'r').read()
+    chunks = isi_interpreter.split_chunks(data, 8)
+    assert(len(chunks) > 1)
+    assert(''.join(chunks) == data)
+    entries = [entry for chunk in chunks
+               for entry in isi_interpreter.split_entries(chunk)]
+    assert(entries == isi_interpreter.split_entries(data))
+
+
+def test_parse_workers():
+    isi_interpreter = IsiInterpreter()
+    data = open('sample_data/isi.txt', 'r').read()
+    assert(isi_interpreter.parse(data, workers=2) ==
+           isi_interpreter.parse(data))
+    # Binary files are decoded translating their line endings
+    crlf = open('sample_data/isi.txt', 'rb').read().replace(b'\n', b'\r\n')
+    assert(isi_interpreter.parse_file(io.BytesIO(crlf), workers=2) ==
+           isi_interpreter.parse(data))
+
+
+def test_parse_corpus_workers():
+    isi_interpreter = IsiInterpreter()
+    data = open('sample_data/isi.txt', 'r').read()
+    serial = isi_interpreter.parse_corpus(data)
+    # The second copy of the records is skipped
+    for txt in (data, data[:data.rindex('EF')] + data):
+        parallel = isi_interpreter.parse_corpus(txt, workers=2)
+        assert(parallel.labels.labels == serial.labels.labels)
+        assert(parallel.sources == serial.sources)
+        assert(parallel.targets == serial.targets)
+        assert(parallel.records == serial.records)
+
+
+def test_iter_split():
+    from io import StringIO
+
+    handler = StringIO('a\nER\n\nbb\nER\n\nccc\nER\n\nEF')
+    pieces = list(iter_split(handler, '\nER\n\n', chunk_size=3))
+    assert(pieces == ['a', 'bb', 'ccc'])
+
+
+def test_iter_entries():
+    isi_interpreter = IsiInterpreter()
+    data = open('sample_data/isi.txt', 'r').read()
+    handler = open('sample_data/isi.txt', 'r')
+    entries = isi_interpreter.iter_entries(handler)
+    assert(not isinstance(entries, list))
+    assert(list(entries) == isi_interpreter.split_entries(data))
+
+
+def test_iter_parse():
+    isi_interpreter = IsiInterpreter()
+    data = open('sample_data/isi.txt', 'r').read()
+    handler = open('sample_data/isi.txt', 'r')
+    entries = isi_interpreter.iter_parse(handler)
+    assert(next(entries) == isi_interpreter.parse(data)[0])
+    assert(len(list(entries)) == 76)
+
+
+def test_iter_parse_mapped():
+    isi_interpreter = IsiInterpreter()
+    handler = open('sample_data/isi.txt', 'r')
+    fields = isi_interpreter.fields
+    expected = [
+        dict((key, value) for key, value in entry.items() if key in fields)
+        for entry in isi_interpreter.parse_file(handler)
+    ]
+    entries = list(isi_interpreter.iter_parse_mapped('sample_data/isi.txt'))
+    assert(entries == expected)
+
+
+def test_iter_parse_mapped_stream():
+    from io import BytesIO
+
+    isi_interpreter = IsiInterpreter()
+    data = open('sample_data/isi.txt', 'rb').read()
+    entries = list(isi_interpreter.iter_parse_mapped(BytesIO(data)))
+    crlf_entries = list(isi_interpreter.iter_parse_mapped(
+        BytesIO(data.replace(b'\n', b'\r\n'))))
+    assert(len(entries) == 77)
+    assert(entries == list(
+        isi_interpreter.iter_parse_mapped('sample_data/isi.txt')))
+    assert(crlf_entries == entries)
+
+
+class UnpeekableStream(io.RawIOBase):
+
+    """Binary stream that can be neither peeked nor rewound, as a pipe"""
+
+    def __init__(self, data):
+        super(UnpeekableStream, self).__init__()
+        self.data = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        chunk = self.data.read(min(len(buffer), 7))
+        buffer[:len(chunk)] = chunk
+        return len(chunk)
+
+
+def test_iter_parse_mapped_crlf_stream():
+    isi_interpreter = IsiInterpreter()
+    data = open('sample_data/isi.txt', 'rb').read()
+    entries = list(isi_interpreter.iter_parse_mapped('sample_data/isi.txt'))
+    stream = UnpeekableStream(data.replace(b'\n', b'\r\n'))
+    assert(list(isi_interpreter.iter_parse_mapped(stream)) == entries)
+    # Line endings may change along the file
+    lines = data.split(b'\n')
+    half = len(lines) // 2
+    stream = UnpeekableStream(b'\r\n'.join(lines[:half]) + b'\r\n' +
+                              b'\n'.join(lines[half:]))
+    assert(list(isi_interpreter.iter_parse_mapped(stream)) == entries)
+
+
+def test_record():
+    record = IsiRecord({'AU': 'Doe, J', 'PY': '2001', 'TI': 'Title'})
+    assert(record['AU'] == 'Doe, J')
+    assert(record.get('VL', '') == '')
+    assert('PY' in record)
+    assert('TI' not in record)
+    assert('BP' not in record)
+    assert(record.keys() == ['AU', 'PY'])
+    assert(record == {'AU': 'Doe, J', 'PY': '2001'})
+    assert(record == IsiRecord({'AU': 'Doe, J', 'PY': '2001'}))
+    assert(record != ['AU', 'PY'])
+    assert(record != None)  # noqa: E711
+    with pytest.raises(TypeError):
+        hash(record)
+
+
+def test_compact_labels():
+    import pickle
+
+    isi_interpreter = IsiInterpreter()
+    compact_interpreter = IsiInterpreter(compact=True)
+    data = open('sample_data/isi.txt', 'r').read()
+    entries = isi_interpreter.parse(data)
+    records = compact_interpreter.parse(data)
+    assert(all(isinstance(record, IsiRecord) for record in records))
+    assert(isi_interpreter.get_label_list(entries) ==
+           compact_interpreter.get_label_list(records))
+    assert(pickle.loads(pickle.dumps(records)) == records)
+    mapped = compact_interpreter.iter_parse_mapped('sample_data/isi.txt')
+    assert(list(mapped) == records)
+
+
 def test_get_entry_label():
     isi_interpreter = IsiInterpreter()
     handler = open('sample_data/isi.txt', 'r')
@@ -203,6 +401,60 @@ def test_get_label_list():
     ]
     assert(isi_interpreter.get_label_list(entries) == sorted(labels))
 
+def test_get_entry_id():
+    isi_interpreter = IsiInterpreter()
+    handler = open('sample_data/isi.txt', 'r')
+    entries = isi_interpreter.parse_file(handler)
+    assert(isi_interpreter.get_entry_id(entries[0]) == 'WOS:000332430800039')
+    assert(isi_interpreter.get_entry_id({}) is None)
+
+
+def test_unique_entries():
+    isi_interpreter = IsiInterpreter()
+    entries = [{'UT': 'a'}, {'UT': 'b'}, {}, {'UT': 'a'}, {}]
+    unique = list(isi_interpreter.unique_entries(entries))
+    assert(unique == [{'UT': 'a'}, {'UT': 'b'}, {}, {}])
+
+
+def test_iter_parse_files():
+    import os
+    import shutil
+    import tempfile
+
+    isi_interpreter = IsiInterpreter()
+    directory = tempfile.mkdtemp()
+    try:
+        for name in ['a.txt', 'b.txt']:
+            shutil.copy('sample_data/isi.txt', os.path.join(directory, name))
+        shutil.copy('test/test_data/artificial_isi.txt',
+                    os.path.join(directory, 'c.txt'))
+        entries = list(isi_interpreter.iter_parse_files(directory))
+        handlers = [open(os.path.join(directory, 'c.txt'), 'r'),
+                    os.path.join(directory, 'a.txt')]
+        handled = list(isi_interpreter.iter_parse_files(handlers))
+    finally:
+        shutil.rmtree(directory)
+
+    # The artificial entry repeats the first sample entry accession number
+    artificial = isi_interpreter.parse_file(
+        open('test/test_data/artificial_isi.txt', 'r'))
+    assert(len(entries) == 77)
+    assert(len(handled) == 77)
+    assert(handled[0] == artificial[0])
+    assert(entries[0] != artificial[0])
+
+
+def test_build_corpus():
+    from tos.graph.utils import extract_edge_relations
+
+    isi_interpreter = IsiInterpreter()
+    handler = open('sample_data/isi.txt', 'r')
+    entries = isi_interpreter.parse_file(handler)
+    corpus = isi_interpreter.build_corpus(iter(entries))
+    assert(sorted(corpus.labels) == isi_interpreter.get_label_list(entries))
+    assert(corpus.edge_relations() ==
+           extract_edge_relations(entries, isi_interpreter))
+
 if __name__ == '__main__':
     test_split_etries_data()
     test_parse_parse_file_coherence()
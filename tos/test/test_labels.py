@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+"""
+Simple tests for the LabelTable class.
+"""
+
+from tos.interpreters.labels import LabelTable
+
+
+def test_intern():
+    table = LabelTable()
+    assert(table.intern('b') == 0)
+    assert(table.intern('a') == 1)
+    assert(table.intern('b') == 0)
+    assert(len(table) == 2)
+    assert(table[1] == 'a')
+    assert('a' in table)
+    assert('c' not in table)
+
+
+def test_intern_all():
+    table = LabelTable(['x', 'y'])
+    assert(table.intern_all(['y', 'z', 'x']) == [1, 2, 0])
+    assert(list(table) == ['x', 'y', 'z'])
+
+
+def test_remap():
+    table = LabelTable(['alpha', 'alphq', 'beta'])
+    canonical = table.remap({'alphq': 'alpha'})
+    assert(list(canonical) == [0, 0, 2])
+
+
+def test_format_label():
+    from tos.interpreters.labels import format_author
+    from tos.interpreters.labels import format_label
+    from tos.interpreters.labels import format_source
+
+    author = format_author('Abu-Reidah', 'I. M.')
+    assert(author == 'Abu-Reidah IM')
+    assert(format_source('J. Chromatogr. A') == 'J CHROMATOGR A')
+    assert(format_label(author, '2013', 'J CHROMATOGR A', '1313', '212',
+                        '10.1016/j.chroma.2013.07.020') ==
+           'Abu-Reidah IM, 2013, J CHROMATOGR A, V1313, P212, '
+           'DOI 10.1016/j.chroma.2013.07.020')
+    assert(format_label('R Core Team', '2012', 'R LANG ENV STAT COMP') ==
+           'R Core Team, 2012, R LANG ENV STAT COMP')
+    assert(format_label('Doe J', '2013', 'PLOS ONE', '8', article='e7') ==
+           'Doe J, 2013, PLOS ONE, V8, pE7')
+
+
+def test_parse_label():
+    from tos.interpreters.labels import parse_label
+
+    assert(parse_label(
+        'Smith J, 2001, NATURE, V410, P100, DOI 10.1038/35065000'
+    ) == ('Smith J', '2001', 'NATURE', '410', '100', '10.1038/35065000'))
+    assert(parse_label(
+        'Keum YS, 2010, HANDBOOK, VOLS 1 AND 2, P627, '
+        'DOI [10.1016/B978-0-12, DOI 10.1016/B978-0-12]'
+    ) == ('Keum YS', '2010', 'HANDBOOK, VOLS 1 AND 2', '', '627',
+          '10.1016/B978-0-12'))
+    assert(parse_label('Kuhn M, 2010, NUCLEIC ACIDS RES, V38, pD552') ==
+           ('Kuhn M', '2010', 'NUCLEIC ACIDS RES', '38', 'D552', ''))
+    assert(parse_label('*FAO, COM COD AL MAN PROC') ==
+           ('*FAO', '', 'COM COD AL MAN PROC', '', '', ''))
+
+
+def test_label_fields():
+    from tos.interpreters.labels import LabelFields
+
+    fields = LabelFields([
+        'Smith J, 2001, NATURE, V410, P100, DOI 10.1038/35065000',
+        '*FAO, COM COD AL MAN PROC',
+    ])
+    fields.extend(['Doe J, 2003, SCIENCE, V1, P2, DOI 10.1038/35065000'])
+    assert(len(fields) == 3)
+    assert(fields[0] == ('Smith J', 2001, 'NATURE', '410', '100',
+                         '10.1038/35065000'))
+    assert(list(fields.years) == [2001, 0, 2003])
+    assert(fields.in_years(2000, 2002) == [0])
+    assert(fields.doi_index() == {'10.1038/35065000': [0, 2]})
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+"""
+Simple tests for the interpreter registry.
+"""
+
+import gzip
+import io
+import subprocess
+import sys
+
+from tos.interpreters import IsiBibInterpreter
+from tos.interpreters import IsiInterpreter
+from tos.interpreters import ScopusBibInterpreter
+from tos.interpreters import ScopusCsvInterpreter
+from tos.interpreters.registry import detect_interpreter
+from tos.interpreters.registry import get_interpreter
+from tos.interpreters.registry import read_head
+from tos.interpreters.registry import sniff_format
+
+CASES = [
+    ('sample_data/isi.txt', 'isi', IsiInterpreter),
+    ('test/test_data/artificial_isi.txt', 'isi', IsiInterpreter),
+    ('test/test_data/artificial_isi.bib', 'isibib', IsiBibInterpreter),
+    ('test/test_data/artificial_scopus.bib', 'scopusbib',
+     ScopusBibInterpreter),
+    ('test/test_data/artificial_scopus.csv', 'scopus', ScopusCsvInterpreter),
+]
+
+
+def test_sniff_format():
+    for path, name, _ in CASES:
+        assert(sniff_format(read_head(path)) == name)
+    assert(sniff_format('Some text\nwith no format') is None)
+
+
+def test_read_head_does_not_consume():
+    data = open('sample_data/isi.txt', 'rb').read()
+    for handler in (io.BytesIO(data), io.BytesIO(gzip.compress(data)),
+                    open('sample_data/isi.txt', 'r')):
+        head = read_head(handler, 64)
+        assert(head.startswith('FN Thomson Reuters'))
+        assert(handler.tell() == 0)
+
+
+def test_read_head_of_large_files():
+    import tempfile
+
+    data = open('sample_data/isi.txt', 'rb').read()
+    with tempfile.NamedTemporaryFile() as handler:
+        handler.write(data)
+        handler.seek(0)
+        head = read_head(handler, 1 << 20)
+        assert(len(head) > 4096 and head == data.decode('utf-8-sig'))
+        assert(handler.tell() == 0)
+
+
+def test_detect_interpreter():
+    for path, _, cls in CASES:
+        assert(type(detect_interpreter(path)) is cls)
+    interpreter = detect_interpreter('sample_data/isi.txt', fields=None)
+    assert(interpreter.fields is None)
+    assert(type(get_interpreter('scopus')) is ScopusCsvInterpreter)
+
+
+def test_interpreters_are_lazy():
+    code = ('import sys, tos.interpreters; '
+            'print(any(name.startswith(("tos.interpreters.isi", '
+            '"tos.interpreters.scopus", "tos.interpreters.bibtex")) '
+            'for name in sys.modules))')
+    output = subprocess.check_output([sys.executable, '-c', code])
+    assert(output.strip() == b'False')
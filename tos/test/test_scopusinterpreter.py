@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+"""
+Simple tests for the ScopusCsvInterpreter class.
+"""
+
+from tos.interpreters.scopustxt import ScopusCsvInterpreter
+from tos.interpreters.scopustxt import get_scopus_author
+from tos.interpreters.scopustxt import get_scopus_reference_label
+
+
+def test_get_scopus_author():
+    assert(get_scopus_author('Pereira S.I., Barros A.S.') == 'Pereira SI')
+    assert(get_scopus_author('Pereira, S.I.; Barros, A.S.') == 'Pereira SI')
+    assert(get_scopus_author('de Bekker C.') == 'de Bekker C')
+
+
+def test_get_scopus_reference_label():
+    cases = [
+        ('Ashraf, M., Foolad, M.R., Roles of glycine betaine (2007) '
+         'Environmental and Experimental Botany, 59 (2), pp. 206-216.',
+         'Ashraf M, 2007, ENVIRONMENTAL AND EXPERIMENTAL BOTANY, V59, P206'),
+        ('Andersen S.B., Gerritsma S., The life of a dead ant, Am. Nat., '
+         '174, 3, pp. 424-433, (2009)',
+         'Andersen SB, 2009, AM NAT, V174, P424'),
+        ('Lemon, J., Plotrix (2006) R-News, 6 (4), pp. 8-12.',
+         'Lemon J, 2006, R NEWS, V6, P8'),
+    ]
+    for reference, label in cases:
+        assert(get_scopus_reference_label(reference) == label)
+
+
+def test_iter_parse():
+    scopus_interpreter = ScopusCsvInterpreter()
+    handler = open('test/test_data/artificial_scopus.csv', 'r')
+    entries = scopus_interpreter.iter_parse(handler)
+    assert(not isinstance(entries, list))
+    entries = list(entries)
+    assert(len(entries) == 2)
+    assert('Title' not in entries[0])
+    assert(len(entries[0]['References']) == 3)
+
+
+def test_parse_parse_file_coherence():
+    scopus_interpreter = ScopusCsvInterpreter(columns=None)
+    data = open('test/test_data/artificial_scopus.csv', 'r').read()
+    handler = open('test/test_data/artificial_scopus.csv', 'r')
+    entries = scopus_interpreter.parse(data)
+    assert(entries == scopus_interpreter.parse_file(handler))
+    assert('Title' in entries[0])
+
+
+def test_get_entry_label():
+    scopus_interpreter = ScopusCsvInterpreter()
+    handler = open('test/test_data/artificial_scopus.csv', 'r')
+    entries = scopus_interpreter.parse_file(handler)
+
+    cases = [
+        (0, 'Pereira SI, 2014, FOOD CHEM, V154, P291, '
+            'DOI 10.1016/j.foodchem.2014.01.019'),
+        (1, 'de Bekker C, 2013, PLOS ONE, V8, pE70609, '
+            'DOI 10.1371/journal.pone.0070609'),
+    ]
+
+    for index, value in cases:
+        assert(scopus_interpreter.get_entry_label(entries[index]) == value)
+
+
+def test_get_referenced_labels():
+    scopus_interpreter = ScopusCsvInterpreter()
+    handler = open('test/test_data/artificial_scopus.csv', 'r')
+    entries = scopus_interpreter.parse_file(handler)
+    references = scopus_interpreter.get_referenced_labels(entries[1])
+    assert(references == [
+        'Pereira SI, 2014, FOOD CHEM, V154, P291',
+        'Andersen SB, 2009, AM NAT, V174, P424',
+    ])
+
+
+def test_get_entry_id():
+    scopus_interpreter = ScopusCsvInterpreter()
+    handler = open('test/test_data/artificial_scopus.csv', 'r')
+    entries = scopus_interpreter.parse_file(handler)
+    assert(scopus_interpreter.get_entry_id(entries[0]) ==
+           '2-s2.0-84893832917')
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+"""
+Simple tests for the similarity backends.
+"""
+
+import pickle
+
+import jellyfish
+import pytest
+
+from tos.graph.similarity import PythonBackend
+from tos.graph.similarity import RapidfuzzBackend
+from tos.graph.similarity import get_backend
+from tos.graph.utils import detect_duplicate_labels
+
+from tos.interpreters import IsiInterpreter
+
+
+def test_python_backend():
+    backend = PythonBackend(jellyfish.levenshtein_distance)
+    assert(backend.scores('apple', ['apple', 'aple', 'pear']) == [0, 1, 4])
+    assert(backend.matches('apple', ['apple', 'aple', 'pear'], 1) == [2])
+    assert(backend.matches('apple', ['apple', 'aple', 'pear'], 1,
+                           inverted=True) == [0])
+    assert(backend.pruner(1) is None)
+    assert(backend.pruner(1, inverted=True)('apple', 'pear'))
+
+
+def test_get_backend():
+    backend = PythonBackend()
+    assert(get_backend(backend) is backend)
+    similarity = lambda label, other: 1.0
+    assert(get_backend('auto', similarity).similarity is similarity)
+    assert(isinstance(get_backend('python'), PythonBackend))
+    with pytest.raises(ValueError):
+        get_backend('fast')
+
+
+def test_rapidfuzz_backend():
+    pytest.importorskip('rapidfuzz')
+
+    labels = ['apple', 'aple', 'pear', 'apples']
+    for similarity, threshold, inverted in [
+            (jellyfish.jaro_winkler, 0.9, False),
+            (jellyfish.levenshtein_distance, 2, True)]:
+        backend = pickle.loads(pickle.dumps(
+            get_backend('rapidfuzz', similarity)))
+        reference = PythonBackend(similarity)
+        assert(backend.scores(labels[0], labels) ==
+               pytest.approx(reference.scores(labels[0], labels)))
+        assert(backend.matches(labels[0], labels, threshold, inverted) ==
+               reference.matches(labels[0], labels, threshold, inverted))
+    assert(isinstance(get_backend(), RapidfuzzBackend))
+
+    isi_interpreter = IsiInterpreter()
+    handler = open('sample_data/isi.txt', 'r')
+    labels = isi_interpreter.get_label_list(isi_interpreter.parse_file(
+        handler))
+    stats = {}
+    assert(detect_duplicate_labels(labels, backend='rapidfuzz',
+                                   stats=stats) ==
+           detect_duplicate_labels(labels, backend='python'))
+    # Pairs are pruned inside rapidfuzz, they are not counted
+    assert(stats['compared'] > 0 and stats['pruned'] is None)
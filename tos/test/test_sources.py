@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+"""
+Simple tests for the compressed sources.
+"""
+
+import bz2
+import gzip
+import io
+import lzma
+import zipfile
+
+from tos.interpreters.isitxt import IsiInterpreter
+from tos.interpreters.scopustxt import ScopusCsvInterpreter
+from tos.interpreters.sources import detect_compression
+from tos.interpreters.sources import iter_streams
+from tos.interpreters.sources import open_text
+from tos.interpreters.sources import peek
+
+
+def zip_compress(*members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for index, data in enumerate(members):
+            archive.writestr('part%d.txt' % index, data)
+    return buffer.getvalue()
+
+
+def test_detect_compression():
+    data = b'FN Thomson Reuters Web of Science'
+    cases = [
+        (data, None),
+        (gzip.compress(data), 'gzip'),
+        (bz2.compress(data), 'bz2'),
+        (lzma.compress(data), 'xz'),
+        (zip_compress(data), 'zip'),
+    ]
+    for content, compression in cases:
+        handler = io.BytesIO(content)
+        assert(detect_compression(handler) == compression)
+        assert(handler.tell() == 0)
+
+
+def test_iter_streams():
+    data = b'some data'
+    handler = io.BytesIO(data)
+    assert(list(iter_streams(handler)) == [handler])
+    streams = iter_streams(io.BytesIO(zip_compress(data, data + data)))
+    assert([stream.read() for stream in streams] == [data, data + data])
+
+
+def test_peek():
+    import tempfile
+
+    data = bytes(range(256)) * 64
+    with tempfile.NamedTemporaryFile() as handler:
+        handler.write(data)
+        handler.seek(0)
+        # Further than the buffer of the handler
+        assert(peek(handler, len(data)) == data)
+        assert(handler.tell() == 0)
+    handler = io.BufferedReader(io.BytesIO(data), buffer_size=16)
+    assert(peek(handler, 100) == data[:100])
+    assert(handler.tell() == 0)
+
+
+def test_open_text():
+    handler = io.BytesIO('a\r\nb\nc\rd \u00e9\r\n'.encode())
+    with open_text(handler) as text:
+        assert(text.read() == 'a\nb\nc\nd \u00e9\n')
+    assert(not handler.closed)
+
+
+def test_parse_compressed_file():
+    isi_interpreter = IsiInterpreter()
+    data = open('sample_data/isi.txt', 'rb').read()
+    entries = isi_interpreter.parse_file(open('sample_data/isi.txt', 'r'))
+
+    for compress in (gzip.compress, bz2.compress, lzma.compress,
+                     zip_compress):
+        handler = io.BytesIO(compress(data))
+        assert(isi_interpreter.parse_file(handler) == entries)
+        handler = io.BytesIO(compress(data))
+        assert(isi_interpreter.parse_file(handler, workers=2) == entries)
+
+
+def test_parse_compressed_path():
+    import os
+    import tempfile
+
+    scopus_interpreter = ScopusCsvInterpreter()
+    path = 'test/test_data/artificial_scopus.csv'
+    entries = scopus_interpreter.parse_file(open(path, 'r'))
+
+    handle, compressed = tempfile.mkstemp(suffix='.gz')
+    try:
+        with os.fdopen(handle, 'wb') as output:
+            output.write(gzip.compress(open(path, 'rb').read()))
+        mapped = list(scopus_interpreter.iter_parse_mapped(compressed))
+    finally:
+        os.remove(compressed)
+
+    assert(mapped == entries)
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+"""
+Simple tests for the TreeOfScience class.
+"""
+
+import io
+import pickle
+
+from tos.graph.tree_of_science import TreeOfScience
+from tos.graph.tree_of_science import load_corpus
+from tos.interpreters import IsiInterpreter
+
+
+def test_data_file_coherence():
+    data = open('sample_data/isi.txt', 'r').read()
+    handler = open('sample_data/isi.txt', 'r')
+    from_data = TreeOfScience(IsiInterpreter(), {'data': data})
+    from_file = TreeOfScience(IsiInterpreter(), {'file': handler})
+    assert(sorted(from_data.graph.vs['label']) ==
+           sorted(from_file.graph.vs['label']))
+    assert(from_data.graph.ecount() == from_file.graph.ecount())
+
+
+def test_data_path_coherence():
+    data = open('sample_data/isi.txt', 'r').read()
+    from_data = TreeOfScience(IsiInterpreter(), {'data': data})
+    from_path = TreeOfScience(IsiInterpreter(),
+                              {'path': 'sample_data/isi.txt'})
+    assert(sorted(from_data.graph.vs['label']) ==
+           sorted(from_path.graph.vs['label']))
+    assert(from_data.graph.ecount() == from_path.graph.ecount())
+
+
+def test_data_files_coherence():
+    data = open('sample_data/isi.txt', 'r').read()
+    from_data = TreeOfScience(IsiInterpreter(), {'data': data})
+    from_files = TreeOfScience(IsiInterpreter(), {
+        'files': ['sample_data/isi.txt', 'sample_data/isi.txt']
+    })
+    assert(sorted(from_data.graph.vs['label']) ==
+           sorted(from_files.graph.vs['label']))
+    assert(from_data.graph.ecount() == from_files.graph.ecount())
+
+
+def test_data_compressed_file_coherence():
+    import gzip
+    import io
+
+    data = open('sample_data/isi.txt', 'r').read()
+    handler = io.BytesIO(gzip.compress(data.encode()))
+    from_data = TreeOfScience(IsiInterpreter(), {'data': data})
+    from_file = TreeOfScience(IsiInterpreter(), {'file': handler})
+    assert(sorted(from_data.graph.vs['label']) ==
+           sorted(from_file.graph.vs['label']))
+    assert(from_data.graph.ecount() == from_file.graph.ecount())
+
+
+def test_pickle():
+    handler = open('sample_data/isi.txt', 'r')
+    tos = TreeOfScience(IsiInterpreter(), {'file': handler})
+    loaded = pickle.loads(pickle.dumps(tos))
+    assert('file' not in loaded.config)
+    assert(list(loaded.root()['label']) == list(tos.root()['label']))
+
+
+def test_tree_of_science_duplicate_workers():
+    isi_interpreter = IsiInterpreter()
+    data = open('sample_data/isi.txt', 'r').read()
+    serial = TreeOfScience(isi_interpreter, {'data': data})
+    parallel = TreeOfScience(isi_interpreter, {
+        'data': data, 'duplicate_options': {'workers': 2},
+    })
+    assert(parallel.graph.vs['label'] == serial.graph.vs['label'])
+    assert(parallel.graph.get_edgelist() == serial.graph.get_edgelist())
+
+
+def test_tree_of_science_parse_workers():
+    data = open('sample_data/isi.txt', 'r').read()
+    serial = TreeOfScience(IsiInterpreter(), {'data': data})
+    crlf = open('sample_data/isi.txt', 'rb').read().replace(b'\n', b'\r\n')
+    for config in ({'data': data},
+                   {'file': open('sample_data/isi.txt', 'r')},
+                   {'file': open('sample_data/isi.txt', 'rb')},
+                   {'file': io.BytesIO(crlf)}):
+        parallel = TreeOfScience(IsiInterpreter(), dict(config, workers=2))
+        assert(parallel.graph.vs['label'] == serial.graph.vs['label'])
+        assert(parallel.graph.get_edgelist() == serial.graph.get_edgelist())
+
+
+def test_tree_of_science_dois():
+    handler = open('sample_data/isi.txt', 'r')
+    tos = TreeOfScience(IsiInterpreter(), {'file': handler})
+    for label, doi in zip(tos.graph.vs['label'], tos.graph.vs['doi']):
+        assert(doi is None or 'DOI ' + doi in label)
+    assert(any(tos.graph.vs['doi']))
+
+
+def test_load_corpus():
+    isi_interpreter = IsiInterpreter()
+    data = open('sample_data/isi.txt', 'r').read()
+    corpus = load_corpus(isi_interpreter, {'path': 'sample_data/isi.txt'})
+    assert(corpus.labels.labels ==
+           load_corpus(isi_interpreter, {'data': data}).labels.labels)
+    assert(load_corpus(isi_interpreter, {'corpus': corpus}) is corpus)
+
+
+def test_tree_of_science_sweep():
+    isi_interpreter = IsiInterpreter()
+    config = {'path': 'sample_data/isi.txt'}
+    results = TreeOfScience.sweep(isi_interpreter, config, [0.96, 0.9])
+    assert([result['threshold'] for result in results] == [0.9, 0.96])
+    for result in results:
+        tree = TreeOfScience(isi_interpreter, dict(config, duplicate_options={
+            'threshold': result['threshold'],
+        }))
+        assert(result['vertices'] == tree.graph.vcount())
+        assert(result['edges'] == tree.graph.ecount())
+        assert(result['root'] == list(tree.root()['label']))
+        assert(result['leaves'] == list(tree.leave()['label']))
@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+
+"""
+Similarity Backends
+-------------------
+
+Backends score a label against a whole list of labels in a single call,
+:func:`~tos.graph.utils.detect_duplicate_labels` hands them each label
+along with its candidates. :class:`PythonBackend`, the reference backend,
+calls a pairwise similarity function of :mod:`jellyfish`, or any other,
+once per pair, and :class:`RapidfuzzBackend` scores the whole list in
+:mod:`rapidfuzz`, when it is installed, with no interpreter overhead per
+pair.
+
+"""
+
+from collections import Counter
+from itertools import repeat
+
+import jellyfish
+
+try:
+    import rapidfuzz
+    import rapidfuzz.distance
+    import rapidfuzz.process
+except ImportError:
+    rapidfuzz = None
+
+# Similarities bounded by the length and the characters in common of the
+# strings, mapped to whether they add Winkler's prefix bonus, and distances
+# at least the characters of the longer string not in the other one
+_JARO = {getattr(jellyfish, name): winkler for name, winkler in (
+    ('jaro_distance', False), ('jaro_similarity', False),
+    ('jaro_winkler', True), ('jaro_winkler_similarity', True),
+) if hasattr(jellyfish, name)}
+_EDIT_DISTANCES = {getattr(jellyfish, name) for name in (
+    'levenshtein_distance', 'damerau_levenshtein_distance',
+    'hamming_distance',
+) if hasattr(jellyfish, name)}
+# Slack of the bounds against rounding errors
+_EPSILON = 1e-9
+
+# Metrics of rapidfuzz computing the same as the functions of jellyfish,
+# along with whether they are distances
+_RAPIDFUZZ_METRICS = {getattr(jellyfish, name): metric for name, metric in (
+    ('jaro_distance', ('Jaro', False)),
+    ('jaro_similarity', ('Jaro', False)),
+    ('jaro_winkler', ('JaroWinkler', False)),
+    ('jaro_winkler_similarity', ('JaroWinkler', False)),
+    ('levenshtein_distance', ('Levenshtein', True)),
+) if hasattr(jellyfish, name)}
+
+
+def _overlap(counts, label, other):
+    # Characters in common of two strings, as multisets
+    for string in (label, other):
+        if string not in counts:
+            counts[string] = Counter(string)
+    return sum((counts[label] & counts[other]).values())
+
+
+def _jaro_pruner(threshold, winkler):
+    # Jaro is at most (m / |a| + m / |b| + 1) / 3 for m matching
+    # characters, at most the length of the shorter string and the
+    # characters in common, Winkler's bonus adds at most 0.4 of the rest
+    if winkler:
+        threshold = (threshold - 0.4) / 0.6
+    threshold = 3 * threshold - 1 - _EPSILON
+    counts = {}
+
+    def prune(label, other):
+        if not label or not other:
+            return False
+        ratio = 1 / len(label) + 1 / len(other)
+        return (min(len(label), len(other)) * ratio <= threshold or
+                _overlap(counts, label, other) * ratio <= threshold)
+
+    return prune
+
+
+def _distance_pruner(threshold):
+    # Every edit fixes at most one character of the longer string missing
+    # in the other one
+    threshold -= _EPSILON
+    counts = {}
+
+    def prune(label, other):
+        longest = max(len(label), len(other))
+        return (longest - min(len(label), len(other)) >= threshold or
+                longest - _overlap(counts, label, other) >= threshold)
+
+    return prune
+
+
+class SimilarityBackend(object):
+
+    """Base class of the similarity backends, subclasses implement
+    :meth:`scores`, and may implement :meth:`scored_matches` and
+    :meth:`pruner` more efficiently
+    """
+
+    #: Whether the pairs that can not pass the threshold are pruned
+    #: through :meth:`pruner` only, so they can be counted, backends
+    #: pruning them while scoring set it to `False`
+    counts_pruned = True
+
+    def scores(self, label, others):
+        """Scores a label against a list of labels
+
+        :param str label: label to be scored
+        :param list others: labels it is scored against
+        :returns: the score of each label of `others`
+        :rtype: list
+        """
+        raise NotImplementedError('Backends must implement scores')
+
+    def scored_matches(self, label, others, threshold, inverted=False):
+        """Scores a label against the labels of a list keeping the scores
+        passing a threshold
+
+        :param str label: label to be scored
+        :param list others: labels it is scored against
+        :param float threshold: scores greater than this pass
+        :param bool inverted: If `True` scores lower than `threshold`
+            pass
+        :returns: the positions in `others` of the labels passing, along
+            with their scores, in order
+        :rtype: list
+        """
+        scores = enumerate(self.scores(label, others))
+        if inverted:
+            return [(i, score) for i, score in scores if score < threshold]
+        return [(i, score) for i, score in scores if score > threshold]
+
+    def matches(self, label, others, threshold, inverted=False):
+        """Finds the labels of a list whose score against a label passes a
+        threshold
+
+        :param str label: label to be scored
+        :param list others: labels it is scored against
+        :param float threshold: scores greater than this pass
+        :param bool inverted: If `True` scores lower than `threshold`
+            pass
+        :returns: the positions in `others` of the labels passing
+        :rtype: list
+        """
+        return [i for i, _ in self.scored_matches(label, others, threshold,
+                                                  inverted)]
+
+    def pruner(self, threshold, inverted=False):
+        """Returns a predicate of the pairs of labels whose score can not
+        pass a threshold, so they need not be scored
+
+        :param float threshold: scores greater than this pass
+        :param bool inverted: If `True` scores lower than `threshold`
+            pass
+        :returns: the predicate, `None` when no pair is known to fail
+        :rtype: function
+        """
+        return None
+
+
+class PythonBackend(SimilarityBackend):
+
+    """Reference backend calling a pairwise similarity function once per
+    pair
+
+    Pairs of labels whose Jaro or Jaro-Winkler similarity of
+    :mod:`jellyfish` can not pass the threshold, being bounded above by the
+    lengths and the characters in common of the labels, are pruned, as are
+    the ones whose edit distances of :mod:`jellyfish` can not pass it in
+    `inverted` mode, being bounded below.
+
+    :param function similarity: pairwise similarity function
+    """
+
+    def __init__(self, similarity=jellyfish.jaro_winkler):
+        super(PythonBackend, self).__init__()
+        self.similarity = similarity
+
+    def scores(self, label, others):
+        return list(map(self.similarity, repeat(label), others))
+
+    def pruner(self, threshold, inverted=False):
+        if not inverted and self.similarity in _JARO:
+            return _jaro_pruner(threshold, _JARO[self.similarity])
+        if inverted and self.similarity in _EDIT_DISTANCES:
+            return _distance_pruner(threshold)
+        return None
+
+
+class RapidfuzzBackend(SimilarityBackend):
+
+    """Backend scoring a label against a list of labels in
+    :mod:`rapidfuzz`, which prunes the pairs that can not pass the
+    threshold itself
+
+    :param str metric: name of the metric in :mod:`rapidfuzz.distance`,
+        e.g. `'JaroWinkler'`, `'Jaro'` or `'Levenshtein'`
+    :param bool distance: If `True` the distance of the metric is
+        computed, otherwise its normalized similarity
+    :raises ImportError: when rapidfuzz is not installed
+    """
+
+    counts_pruned = False
+
+    def __init__(self, metric='JaroWinkler', distance=False):
+        super(RapidfuzzBackend, self).__init__()
+        if rapidfuzz is None:
+            raise ImportError('The rapidfuzz backend requires rapidfuzz')
+        self.metric = metric
+        self.distance = distance
+        # Scorers can not be pickled, they are looked up again in worker
+        # processes
+        self._scorer = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_scorer'] = None
+        return state
+
+    @classmethod
+    def from_similarity(cls, similarity):
+        """Returns the backend computing the same as a function of
+        :mod:`jellyfish`
+
+        :param function similarity: Jaro, Jaro-Winkler or Levenshtein
+            function of :mod:`jellyfish`
+        :rtype: :class:`RapidfuzzBackend`
+        :raises ValueError: when rapidfuzz has no such metric
+        """
+        if similarity not in _RAPIDFUZZ_METRICS:
+            raise ValueError('No rapidfuzz metric computes %r'
+                             % (similarity, ))
+        return cls(*_RAPIDFUZZ_METRICS[similarity])
+
+    @property
+    def scorer(self):
+        """Scoring function of :mod:`rapidfuzz`"""
+        if self._scorer is None:
+            metric = getattr(rapidfuzz.distance, self.metric)
+            self._scorer = metric.distance if self.distance else (
+                metric.normalized_similarity)
+        return self._scorer
+
+    def _extract(self, label, others, score_cutoff=None):
+        return rapidfuzz.process.extract(
+            label, others, scorer=self.scorer, processor=None, limit=None,
+            score_cutoff=score_cutoff)
+
+    def scores(self, label, others):
+        scores = [None] * len(others)
+        for _, score, i in self._extract(label, others):
+            scores[i] = score
+        return scores
+
+    def scored_matches(self, label, others, threshold, inverted=False):
+        if inverted != self.distance:
+            return super(RapidfuzzBackend, self).scored_matches(
+                label, others, threshold, inverted)
+        # The cutoff is inclusive, scores equal to the threshold are
+        # dropped afterwards
+        if inverted:
+            return sorted((i, score) for _, score, i in self._extract(
+                label, others, int(threshold)) if score < threshold)
+        return sorted((i, score) for _, score, i in self._extract(
+            label, others, threshold) if score > threshold)
+
+
+#: Names of the backends, see :func:`get_backend`
+BACKENDS = ('auto', 'python', 'rapidfuzz')
+
+
+def get_backend(backend='auto', similarity=jellyfish.jaro_winkler):
+    """Returns a similarity backend
+
+    :param backend: a :class:`SimilarityBackend`, returned as is, or the
+        name of a backend: `'python'` for a :class:`PythonBackend` calling
+        `similarity`, `'rapidfuzz'` for the :class:`RapidfuzzBackend`
+        computing `similarity`, and `'auto'` for the latter when rapidfuzz
+        is installed and computes `similarity`, the former otherwise
+    :type backend: str or :class:`SimilarityBackend`
+    :param function similarity: pairwise similarity function
+    :rtype: :class:`SimilarityBackend`
+    :raises ValueError: when the backend is unknown or rapidfuzz does not
+        compute `similarity`
+    :raises ImportError: when the rapidfuzz backend is asked for and
+        rapidfuzz is not installed
+    """
+    if isinstance(backend, SimilarityBackend):
+        return backend
+    if backend not in BACKENDS:
+        raise ValueError('Unknown backend %r' % (backend, ))
+    if backend == 'rapidfuzz' or (backend == 'auto' and
+                                  rapidfuzz is not None and
+                                  similarity in _RAPIDFUZZ_METRICS):
+        return RapidfuzzBackend.from_similarity(similarity)
+    return PythonBackend(similarity)
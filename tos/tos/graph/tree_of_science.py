@@ -8,10 +8,104 @@ citation graph.
 
 """
 
+import io
+
 import igraph as ig
 
 import tos.graph.utils as utils
 
+from tos.interpreters.cache import CorpusCache
+from tos.interpreters.cache import corpus_key
+from tos.interpreters.corpus import Corpus
+from tos.interpreters.sources import iter_streams
+from tos.interpreters.sources import open_text
+from tos.interpreters.sources import list_files
+
+
+def _iter_entries(interpreter, config):
+    # Unique entries of the input of a configuration
+    if 'files' in config:
+        # Already free of duplicates
+        return interpreter.iter_parse_files(config['files'])
+    if 'data' in config:
+        entries = interpreter.parse(config['data'])
+    elif 'path' in config:
+        entries = interpreter.iter_parse_mapped(config['path'])
+    elif isinstance(config['file'], io.TextIOBase):
+        entries = interpreter.iter_parse(config['file'])
+    else:
+        entries = interpreter.iter_parse_mapped(config['file'])
+    return interpreter.unique_entries(entries)
+
+
+def _build_corpus(interpreter, config):
+    # Corpus of the input of a configuration, texts parsed in parallel are
+    # sent back from the workers as corpora rather than as entries
+    workers = config.get('workers')
+    if workers is not None and workers > 1 and 'files' not in config:
+        if 'data' in config:
+            return interpreter.parse_corpus(config['data'], workers)
+        if 'path' not in config:
+            # Files are read whole when parsing in parallel
+            handler = config['file']
+            if isinstance(handler, io.TextIOBase):
+                return interpreter.parse_corpus(handler.read(), workers)
+            corpus = Corpus()
+            for stream in iter_streams(handler):
+                with open_text(stream) as text:
+                    interpreter.parse_corpus(text.read(), workers, corpus)
+            return corpus
+    return interpreter.build_corpus(_iter_entries(interpreter, config))
+
+
+def _cache_sources(config):
+    # Inputs given as handlers are not cached
+    if 'files' in config:
+        sources = config['files']
+        if isinstance(sources, str):
+            sources = list_files(sources)
+        if not all(isinstance(source, str) for source in sources):
+            return None
+        return sources
+    if 'data' in config:
+        return [config['data'].encode('utf-8')]
+    if 'path' in config:
+        return [config['path']]
+    return None
+
+
+def load_corpus(interpreter, config):
+    """Builds the corpus of the input of a configuration, or loads it from
+    the cache of the configuration
+
+    :param interpreter: interpreter of the input
+    :type interpreter:
+        :class:`~tos.interpreters.interpreter.BaseInterpreter`
+    :param dict config: configuration, see
+        :meth:`~tos.graph.tree_of_science.TreeOfScience.configure`
+    :returns: the corpus, the one in the `corpus` field if given
+    :rtype: :class:`~tos.interpreters.corpus.Corpus`
+    """
+    if 'corpus' in config:
+        return config['corpus']
+    cache = config.get('cache')
+    sources = None if cache is None else _cache_sources(config)
+    if sources is None:
+        return _build_corpus(interpreter, config)
+    if isinstance(cache, str):
+        cache = CorpusCache(cache)
+
+    if 'files' in config:
+        # Only the files added since the last build are parsed
+        return cache.build_corpus(interpreter, sources)
+
+    key = corpus_key(interpreter, sources)
+    corpus = cache.load(key)
+    if corpus is None:
+        corpus = _build_corpus(interpreter, config)
+        cache.store(key, corpus)
+    return corpus
+
 
 class TreeOfScience(object):
 
@@ -29,27 +123,51 @@ class TreeOfScience(object):
         self.config = config
         self.configure()
 
+    def __getstate__(self):
+        # The input is not needed once the graph is built and file
+        # handlers can not be pickled
+        state = self.__dict__.copy()
+        state['config'] = {key: value for key, value in self.config.items()
+                           if key not in ('data', 'file', 'files', 'corpus',
+                                          'duplicates')}
+        # Caches are kept by their directory
+        if isinstance(state['config'].get('cache'), CorpusCache):
+            state['config']['cache'] = state['config']['cache'].directory
+        return state
+
     def __build_graph(self):
-        entries = self.interpreter.parse(self.config['data'])
-        labels = self.interpreter.get_label_list(entries)
-
-        duplicate_options = self.config.get('duplicate_options', {})
-        duplicates = utils.detect_duplicate_labels(labels,
-                                                   **duplicate_options)
-        unique_labels = list(set(utils.patch_list(labels, duplicates)))
-        edge_relations = utils.extract_edge_relations(entries,
-                                                      self.interpreter)
-        unique_edge_relations = list(set(
-            utils.patch_tuple_list(edge_relations, duplicates)
+        corpus = load_corpus(self.interpreter, self.config)
+        table = corpus.labels
+
+        fields = corpus.fields
+        if 'duplicates' in self.config:
+            duplicates = self.config['duplicates']
+        else:
+            duplicate_options = dict(self.config.get('duplicate_options', {}))
+            duplicate_options.setdefault('fields', fields)
+            duplicates = utils.detect_duplicate_labels(table.labels,
+                                                       **duplicate_options)
+
+        # Compose the duplicate patch with a renumbering into vertices
+        canonical = table.remap(duplicates)
+        vertices = utils.renumber(canonical)
+        unique_labels = [None] * (max(vertices) + 1 if vertices else 0)
+        unique_dois = [None] * len(unique_labels)
+        for identifier, vertex in zip(canonical, vertices):
+            unique_labels[vertex] = table[identifier]
+            unique_dois[vertex] = fields.dois[identifier] or None
+
+        unique_edge_relations = set(zip(
+            map(vertices.__getitem__, corpus.sources),
+            map(vertices.__getitem__, corpus.targets),
         ))
 
-        identifiers = dict(zip(unique_labels, range(len(unique_labels))))
-        self.graph = ig.Graph(
-            utils.patch_tuple_list(unique_edge_relations, identifiers),
-            directed=True
-        )
+        self.graph = ig.Graph(len(unique_labels),
+                              list(unique_edge_relations),
+                              directed=True)
 
         self.graph.vs['label'] = unique_labels
+        self.graph.vs['doi'] = unique_dois
 
     def __preprocess_graph(self):
         # Filter out vertices that are not relevant in the dataset
@@ -66,11 +184,47 @@ class TreeOfScience(object):
 
     def configure(self):
         """Configures the :class:`~tos.graph.tree_of_science.TreeOfScience`
-        instance according to
-        its configuration and a given `data` field given in the config
-        dictionary, it creates a graph from the edge relations of the
-        entries contained in the data, filters the graph purging unnecesary
-        vertices, and then extract the giant component of the graph.
+        instance according to its configuration dictionary, the input is
+        given in one of the following fields:
+
+        - `data`: a string with the records.
+        - `file`: an open file handler, parsed as a stream without reading
+          it whole, binary handlers may be gzip, bz2, xz or zip compressed.
+        - `path`: the path of a file, handed to
+          :meth:`~tos.interpreters.interpreter.BaseInterpreter.iter_parse_mapped`
+          so the interpreter may scan its raw bytes, it may be compressed
+          too.
+        - `files`: a list of paths or handlers, or the path of a directory,
+          whose files are parsed in sequence.
+
+        An optional `workers` field sets the number of processes used for
+        parsing `data` and `file` inputs, see
+        :meth:`~tos.interpreters.interpreter.BaseInterpreter.parse_corpus`,
+        note that a `file` is read whole when parsing in parallel.
+
+        An optional `cache` field, a
+        :class:`~tos.interpreters.cache.CorpusCache` or the path of its
+        directory, keeps the corpora built out of `data`, `path` and
+        `files` inputs, so they are parsed only once, when files are
+        appended to `files` only the new ones are parsed.
+
+        An optional `duplicate_options` field holds the keyword arguments
+        of :func:`~tos.graph.utils.detect_duplicate_labels`, e.g.
+        ``{'candidates': 'minhash', 'workers': 8}`` to compare only similar
+        labels in 8 processes, or ``{'backend': 'python'}`` to score them
+        with :mod:`jellyfish` even when :mod:`rapidfuzz` is installed.
+
+        A :class:`~tos.interpreters.corpus.Corpus` already built may be
+        given in a `corpus` field instead of an input, and the duplicate
+        map of its labels in a `duplicates` field, so they are not looked
+        for, see :meth:`sweep`.
+
+        It creates a graph from the edge relations of the entries contained
+        in the input, dropping duplicate records using
+        :meth:`~tos.interpreters.interpreter.BaseInterpreter.unique_entries`,
+        filters the graph purging unnecesary vertices, and then extract the
+        giant component of the graph. Vertices carry the `label` and the
+        `doi`, if any, of the work they stand for.
         In a postprocessing stage it adds the edge and vertex betweenness
         to the graphs properties.
         """
@@ -78,6 +232,56 @@ class TreeOfScience(object):
         self.__preprocess_graph()
         self.__post_processg_graph()
 
+    @classmethod
+    def sweep(cls, interpreter, config, thresholds,
+              shared_first_letters=None, count=10):
+        """Builds the trees of an input for several thresholds of the
+        duplicate detection, and shared first letters, parsing the input
+        and scoring the candidate pairs of labels once, see
+        :func:`~tos.graph.utils.sweep_duplicates`
+
+        :param interpreter: interpreter of the input
+        :type interpreter:
+            :class:`~tos.interpreters.interpreter.BaseInterpreter`
+        :param dict config: configuration, see :meth:`configure`, the
+            threshold and the shared first letters of its
+            `duplicate_options` are swept
+        :param list thresholds: thresholds of the similarity
+        :param list shared_first_letters: amounts of characters the labels
+            compared share at the beggining
+        :param int count: length of the rankings
+        :returns: for each pair of threshold and shared first letters, a
+            dictionary with them, the number of `duplicates` merged, the
+            number of `vertices` and `edges` of the tree, and the labels
+            of its `root`, `trunk` and `leaves` rankings
+        :rtype: list
+        """
+        corpus = load_corpus(interpreter, config)
+
+        duplicate_options = dict(config.get('duplicate_options', {}))
+        duplicate_options.pop('threshold', None)
+        duplicate_options.pop('shared_first_letters', None)
+        duplicate_options.setdefault('fields', corpus.fields)
+        sweep = utils.sweep_duplicates(corpus.labels.labels, thresholds,
+                                       shared_first_letters,
+                                       **duplicate_options)
+
+        results = []
+        for (threshold, letters), duplicates in sorted(sweep.items()):
+            tree = cls(interpreter, dict(config, corpus=corpus,
+                                         duplicates=duplicates))
+            results.append({
+                'threshold': threshold,
+                'shared_first_letters': letters,
+                'duplicates': len(duplicates),
+                'vertices': tree.graph.vcount(),
+                'edges': tree.graph.ecount(),
+                'root': list(tree.root(count=count)['label']),
+                'trunk': list(tree.trunk(count=count)['label']),
+                'leaves': list(tree.leave(count=count)['label']),
+            })
+        return results
+
     def root(self, offset=0, count=10):
         """Computes the nodes in the root of the graph using
         the following criteria: nodes with high in degree, and zero
@@ -10,8 +10,28 @@ directed graph from an entry list possibli comming form a
 
 """
 
+import os
+import re
+
+from array import array
+from collections import Counter
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from random import Random
+
 import jellyfish
 
+from tos.graph.similarity import get_backend
+from tos.interpreters.labels import parse_label
+
+#: Number of ranges of labels per process when detecting duplicates in
+#: parallel, several ranges per process balance the load of uneven blocks
+CHUNKS_PER_WORKER = 4
+
+_NOT_ALPHANUMERIC = re.compile(r'[^0-9A-Z]')
+# Initials following the surname of the authors of cited references
+_INITIALS = re.compile(r'[A-Z][A-Z.-]{0,4}$')
+
 
 def extract_edge_relations(entries, interpreter):
     """Returns an edge list for the given entries
@@ -39,18 +59,536 @@ def extract_edge_relations(entries, interpreter):
     return edges
 
 
+class DisjointSet(object):
+
+    """Union-find structure over the integers from zero to `size` minus
+    one, every integer starts in a set of its own
+
+    Sets are merged by size and paths are compressed while looking for the
+    root of a set, so any sequence of operations runs in nearly linear
+    time.
+
+    :param int size: number of elements
+    """
+
+    def __init__(self, size):
+        super(DisjointSet, self).__init__()
+        self.parents = array('l', range(size))
+        self.sizes = array('l', [1]) * size
+
+    def __len__(self):
+        return len(self.parents)
+
+    def find(self, item):
+        """Returns the root of the set of an element
+
+        :param int item: element
+        :returns: root element of its set
+        :rtype: int
+        """
+        parents = self.parents
+        root = item
+        while parents[root] != root:
+            root = parents[root]
+        while parents[item] != root:
+            parents[item], item = root, parents[item]
+        return root
+
+    def union(self, item, other):
+        """Merges the sets of two elements
+
+        :param int item: element
+        :param int other: another element
+        :returns: root of the merged set
+        :rtype: int
+        """
+        item, other = self.find(item), self.find(other)
+        if item == other:
+            return item
+        if self.sizes[item] < self.sizes[other]:
+            item, other = other, item
+        self.parents[other] = item
+        self.sizes[item] += self.sizes[other]
+        return item
+
+    def size(self, item):
+        """Returns the size of the set of an element
+
+        :param int item: element
+        :rtype: int
+        """
+        return self.sizes[self.find(item)]
+
+    def firsts(self):
+        """Computes the smallest element of the set of every element
+
+        :returns: array holding the smallest element of the set of every
+            element
+        :rtype: :class:`~array.array`
+        """
+        firsts = array('l', range(len(self)))
+        smallest = {}
+        for item in range(len(self)):
+            firsts[item] = smallest.setdefault(self.find(item), item)
+        return firsts
+
+
+def _prefix_candidates(labels, size):
+    # Sorted labels sharing their first characters are contiguous
+    start, end = None, 0
+    for i, label in enumerate(labels):
+        if label[:size] != start or end <= i:
+            start, end = label[:size], i + 1
+            while end < len(labels) and labels[end].startswith(start):
+                end += 1
+        yield range(i + 1, end)
+
+
+def _ngrams(label, size):
+    padding = ' ' * (size - 1)
+    label = padding + label + padding
+    return {label[k:k + size] for k in range(len(label) - size + 1)}
+
+
+def _minhash_candidates(labels, size, bands, rows, max_frequency):
+    # Grams shared by a large fraction of the labels, such as the ', V'
+    # and 'DOI ' separators, tell nothing about them and would gather
+    # unrelated labels in the same buckets
+    frequency = Counter()
+    for label in labels:
+        frequency.update(_ngrams(label, size))
+    limit = max(max_frequency * len(labels), 32)
+
+    # Every gram gets a row of 16 bits hashes, drawn in gram order so
+    # they do not depend on the order of the labels, made of shared int
+    # objects to keep the rows small
+    count = bands * rows
+    values = list(range(1 << 16))
+    random = Random(0)
+    hashes = {}
+    for gram in sorted(frequency):
+        if frequency[gram] <= limit:
+            hashes[gram] = tuple(map(values.__getitem__, array(
+                'H', random.getrandbits(16 * count).to_bytes(2 * count,
+                                                             'little'))))
+    del frequency, values
+
+    # Labels whose signatures agree in every row of a band share a bucket,
+    # so the labels sharing a bucket are likely similar
+    buckets = defaultdict(list)
+    for i, label in enumerate(labels):
+        grams = [hashes[gram] for gram in _ngrams(label, size)
+                 if gram in hashes]
+        if not grams:
+            continue
+        signature = tuple(map(min, zip(*grams)))
+        for band in range(0, count, rows):
+            buckets[(band, ) + signature[band:band + rows]].append(i)
+    del hashes
+
+    candidates = defaultdict(set)
+    for bucket in buckets.values():
+        for k in range(len(bucket) - 1):
+            candidates[bucket[k]].update(bucket[k + 1:])
+    return [sorted(candidates.get(i, ())) for i in range(len(labels))]
+
+
+def _surname(author):
+    # Whole surname of an author, particles included, without spaces nor
+    # punctuation, so `DE SOUZA AB` and `DeSouza A` share it
+    names = author.split()
+    if len(names) > 1 and _INITIALS.match(names[-1]) and (
+            len(_NOT_ALPHANUMERIC.sub('', names[-1])) <= 3):
+        names.pop()
+    return _NOT_ALPHANUMERIC.sub('', ''.join(names).upper())
+
+
+def _block_keys(parts, same_source):
+    # Surname, year and optionally source of every label
+    for author, year, source, _, _, _ in parts:
+        yield ((_surname(author), source if same_source else None),
+               int(year or 0))
+
+
+def _block_candidates(keys, year_window):
+    # Labels sharing a block key whose years are at most `year_window`
+    # apart, keys are given for each label in sorted order
+    blocks = defaultdict(lambda: defaultdict(list))
+    for i, (key, year) in enumerate(keys):
+        blocks[key][year].append(i)
+
+    candidates = defaultdict(list)
+    for years in blocks.values():
+        for year, members in years.items():
+            for other in range(year - year_window, year + year_window + 1):
+                others = years.get(other, ())
+                for i in members:
+                    candidates[i].extend(j for j in others if j > i)
+
+    for i in range(len(keys)):
+        yield sorted(candidates.pop(i, ()))
+
+
+def _score(labels, count, candidates, dois, backend, threshold, inverted):
+    # Candidates of the first `count` labels passing the threshold, the
+    # candidates are those of the prefix blocks if given as their size,
+    # labels with different DOIs, flagged in `dois`, are not compared.
+    # Returns them, along with their scores, and the number of pairs
+    # compared and pruned
+    if isinstance(candidates, int):
+        candidates = _prefix_candidates(labels, candidates)
+
+    prune = backend.pruner(threshold, inverted)
+
+    scored = []
+    compared = pruned = 0
+    for i, others in zip(range(count), candidates):
+        label = labels[i]
+        if dois is not None and dois[i]:
+            others = [j for j in others if not dois[j]]
+        if prune is not None:
+            kept = [j for j in others if not prune(label, labels[j])]
+            pruned += len(others) - len(kept)
+            others = kept
+        compared += len(others)
+        matches = backend.scored_matches(
+            label, [labels[j] for j in others], threshold, inverted
+        ) if others else []
+        scored.append([(others[k], score) for k, score in matches])
+    return scored, compared, pruned
+
+
+def _exact_keys(parts):
+    # Keys identifying the work cited by a label, given its parts, if any
+    author, year, source, volume, page, doi = parts
+    keys = []
+    if doi:
+        keys.append(('doi', doi.lower()))
+    author = _NOT_ALPHANUMERIC.sub('', author.upper())
+    source = _NOT_ALPHANUMERIC.sub('', source.upper())
+    if author and year and source and volume and page:
+        keys.append((author, year, source, volume.upper(), page.upper()))
+    return keys
+
+
+def _union_dois(clusters, dois, item, other):
+    # Merges the clusters of two labels unless they carry different DOIs,
+    # `dois` maps the roots of the clusters to their DOIs
+    item, other = clusters.find(item), clusters.find(other)
+    if item == other:
+        return
+    doi, other_doi = dois.get(item), dois.get(other)
+    if doi and other_doi and doi != other_doi:
+        return
+    dois[clusters.union(item, other)] = doi or other_doi
+
+
+def _split_ranges(candidates, count):
+    # Ranges of labels with about the same number of candidates, along
+    # with the end of the labels they are compared with
+    share = sum(map(len, candidates)) / count
+    ranges = []
+    start = reach = cost = 0
+    for i, others in enumerate(candidates):
+        if cost >= share:
+            ranges.append((start, i, reach))
+            start, cost = i, 0
+        reach = max(reach, others[-1] + 1 if others else i + 1)
+        cost += len(others)
+    ranges.append((start, len(candidates), max(reach, len(candidates))))
+    return ranges
+
+
+class ScoredPairs(object):
+
+    """Sparse table of the pairs of labels scored by :func:`score_pairs`,
+    the pairs passing a threshold along with their scores
+
+    :param list labels: Labels, in alphabetical order
+    :param float threshold: Scores of the pairs pass it
+    :param bool inverted: If `True` the scores are lower than `threshold`
+    :param int shared_first_letters: Characters at the beggining every pair
+        of labels shares
+    """
+
+    def __init__(self, labels, threshold, inverted=False,
+                 shared_first_letters=0):
+        super(ScoredPairs, self).__init__()
+        self.labels = labels
+        self.threshold = threshold
+        self.inverted = inverted
+        self.shared_first_letters = shared_first_letters
+        #: First label of the cluster of each label, as merged by exact
+        #: keys before scoring
+        self.merged = array('l', range(len(labels)))
+        #: Lower cased DOI of each label, if any, labels with different
+        #: DOIs are not merged, `None` when DOIs are not looked at
+        self.dois = None
+        #: First label of each pair
+        self.firsts = array('l')
+        #: Second label of each pair
+        self.seconds = array('l')
+        #: Score of each pair
+        self.scores = array('d')
+        #: Characters at the beggining both labels of each pair share
+        self.shared = array('l')
+
+    def __len__(self):
+        return len(self.scores)
+
+    def add(self, first, second, score):
+        """Adds a scored pair
+
+        :param int first: Position of the first label
+        :param int second: Position of the second label
+        :param float score: Score of the pair
+        """
+        self.firsts.append(first)
+        self.seconds.append(second)
+        self.scores.append(score)
+        self.shared.append(len(os.path.commonprefix(
+            (self.labels[first], self.labels[second]))))
+
+    def duplicates(self, threshold=None, shared_first_letters=None):
+        """Returns the duplicate map of the pairs passing a threshold, as
+        :func:`detect_duplicate_labels` does
+
+        :param float threshold: Pairs with a greater score are duplicates,
+            or a lower one in inverted mode, as strict as the threshold of
+            the table at least, the threshold of the table by default
+        :param int shared_first_letters: Only pairs of labels sharing this
+            ammount of characters at the beggining are duplicates, as many
+            as the labels of the table share at least
+        :returns: Duplicate map
+        :rtype: dict
+        :raises ValueError: when the threshold, or the shared letters, let
+            pairs the table does not hold pass
+        """
+        if threshold is None:
+            threshold = self.threshold
+        if (threshold > self.threshold if self.inverted else
+                threshold < self.threshold):
+            raise ValueError('Pairs are scored up to %r'
+                             % (self.threshold, ))
+        if shared_first_letters is None:
+            shared_first_letters = self.shared_first_letters
+        if shared_first_letters < self.shared_first_letters:
+            raise ValueError('Pairs share %r letters at least'
+                             % (self.shared_first_letters, ))
+
+        clusters = DisjointSet(len(self.labels))
+        if self.dois is None:
+            union = clusters.union
+        else:
+            # Labels with different DOIs are never merged, best pairs are
+            # merged first
+            dois = {i: doi for i, doi in enumerate(self.dois) if doi}
+            union = lambda item, other: _union_dois(clusters, dois, item,
+                                                    other)
+        for i, first in enumerate(self.merged):
+            if first != i:
+                union(first, i)
+        pairs = sorted(zip(self.scores, self.firsts, self.seconds,
+                           self.shared), reverse=not self.inverted)
+        for score, first, second, shared in pairs:
+            if ((score < threshold if self.inverted else score > threshold)
+                    and shared >= shared_first_letters):
+                union(first, second)
+
+        return {
+            self.labels[i]: self.labels[first]
+            for i, first in enumerate(clusters.firsts())
+            if self.labels[i] != self.labels[first]
+        }
+
+
+def score_pairs(labels,
+                similarity=jellyfish.jaro_winkler,
+                shared_first_letters=2,
+                threshold=0.96,
+                inverted=False,
+                candidates='prefix',
+                ngram_size=3,
+                bands=20,
+                rows=3,
+                max_frequency=0.05,
+                workers=None,
+                exact_keys=False,
+                fields=None,
+                year_window=1,
+                same_source=False,
+                stats=None,
+                backend='auto'):
+    """Scores the candidate pairs of labels of a list, keeping the pairs
+    passing `threshold` in a sparse table
+
+    Candidate pairs are chosen and scored as in
+    :func:`detect_duplicate_labels`, which takes the same arguments, but
+    the table keeps the score of every pair passing `threshold`, so the
+    duplicates passing stricter thresholds, or sharing more first letters,
+    are found filtering the table, see :meth:`ScoredPairs.duplicates`.
+
+    :returns: Scored pairs
+    :rtype: :class:`ScoredPairs`
+    """
+    if fields is None:
+        order = None
+        sorted_labels = sorted(labels)
+    else:
+        order = sorted(range(len(labels)), key=labels.__getitem__)
+        sorted_labels = [labels[i] for i in order]
+    clusters = DisjointSet(len(sorted_labels))
+    prefix = candidates == 'prefix'
+    table = ScoredPairs(sorted_labels, threshold, inverted,
+                        shared_first_letters if prefix else 0)
+
+    if order is None:
+        parts = map(parse_label, sorted_labels)
+    else:
+        parts = map(fields.__getitem__, order)
+    if candidates == 'blocks':
+        parts = list(parts)
+
+    if exact_keys:
+        # Labels sharing a key are merged right away, unless they carry
+        # different DOIs, only the first one is compared
+        firsts = {}
+        table.dois = []
+        cluster_dois = {}
+        for i, label_parts in enumerate(parts):
+            doi = label_parts[5].lower() or None
+            table.dois.append(doi)
+            if doi:
+                cluster_dois[i] = doi
+            for key in _exact_keys(label_parts):
+                _union_dois(clusters, cluster_dois,
+                            firsts.setdefault(key, i), i)
+        del firsts
+        compared = [i for i, first in enumerate(clusters.firsts())
+                    if first == i]
+        compared_labels = [sorted_labels[i] for i in compared]
+        # Clusters carrying a DOI, whatever label carries it
+        dois = bytearray(bool(cluster_dois.get(clusters.find(i)))
+                         for i in compared)
+    else:
+        compared = range(len(sorted_labels))
+        compared_labels = sorted_labels
+        dois = None
+
+    if prefix:
+        candidates = _prefix_candidates(compared_labels, shared_first_letters)
+    elif candidates == 'minhash':
+        candidates = _minhash_candidates(compared_labels, ngram_size, bands,
+                                         rows, max_frequency)
+    elif candidates == 'blocks':
+        keys = _block_keys(map(parts.__getitem__, compared), same_source)
+        candidates = _block_candidates(list(keys), year_window)
+    else:
+        raise ValueError('Unknown candidates %r' % (candidates, ))
+
+    backend = get_backend(backend, similarity)
+    args = (backend, threshold, inverted)
+
+    if workers is None or workers < 2 or not compared_labels:
+        scored, calls, pruned = _score(compared_labels, len(compared),
+                                       candidates, dois, *args)
+    else:
+        # Ranges of labels are compared with their candidates in parallel
+        candidates = list(candidates)
+        ranges = _split_ranges(candidates, workers * CHUNKS_PER_WORKER)
+        tasks = [(
+            compared_labels[start:reach],
+            stop - start,
+            shared_first_letters if prefix else
+            [[j - start for j in others] for others in candidates[start:stop]],
+            None if dois is None else dois[start:reach],
+        ) + args for start, stop, reach in ranges]
+
+        scored = []
+        calls = pruned = 0
+        with ProcessPoolExecutor(workers) as executor:
+            chunks = executor.map(_score, *zip(*tasks))
+            for (start, _, _), (chunk, compared_pairs, pruned_pairs) in zip(
+                    ranges, chunks):
+                scored.extend([(j + start, score) for j, score in others]
+                              for others in chunk)
+                calls += compared_pairs
+                pruned += pruned_pairs
+
+    if stats is not None:
+        # Pairs pruned inside the backend are not known
+        stats.update(compared=calls,
+                     pruned=pruned if backend.counts_pruned else None)
+
+    table.merged = clusters.firsts()
+    for i, others in enumerate(scored):
+        for j, score in others:
+            table.add(compared[i], compared[j], score)
+    return table
+
+
 def detect_duplicate_labels(labels,
                             similarity=jellyfish.jaro_winkler,
                             shared_first_letters=2,
                             threshold=0.96,
-                            inverted=False):
+                            inverted=False,
+                            candidates='prefix',
+                            ngram_size=3,
+                            bands=20,
+                            rows=3,
+                            max_frequency=0.05,
+                            workers=None,
+                            exact_keys=False,
+                            fields=None,
+                            year_window=1,
+                            same_source=False,
+                            stats=None,
+                            backend='auto'):
     """Detects duplicate strings in a list
 
-    Detects duplicate strings comparing every pair of strings that
-    share the same characters up to `shared_first_leters`
+    Detects duplicate strings comparing every pair of candidate strings
     and returns a dictionary with patching information to reduce
     the list to unique labels.
 
+    Candidates are chosen according to `candidates`:
+
+    - `'prefix'`: strings that share the same characters up to
+      `shared_first_letters`, every pair of a block is compared so large
+      blocks of common surnames are slow to process.
+    - `'minhash'`: strings whose sets of character n-grams are similar,
+      found by locality sensitive hashing of their MinHash signatures,
+      `bands` groups of `rows` hashes, so only plausible pairs are
+      compared whatever their first letters. Candidates are found with
+      high probability, not for sure, the default settings catch pairs
+      sharing more than half of their n-grams.
+    - `'blocks'`: strings of cited references sharing the surname of
+      their author, particles included and spaces and punctuation
+      removed, e.g. `DE SOUZA AB` and `DESOUZA A`, published at most
+      `year_window` years apart, and in the same source if `same_source`
+      is set. Far fewer pairs are compared than in prefix blocks, but
+      duplicates whose surnames or years differ are missed.
+
+    When `exact_keys` is set, labels of cited references sharing their
+    DOI, or their author, year, source, volume and page, are duplicates
+    right away, and only the first of them is compared with the other
+    labels. Labels carrying different DOIs cite different works, they are
+    neither compared nor merged, even through other labels, so on corpora
+    where most references carry a DOI most similarities are never
+    computed.
+
+    Each label is scored against all of its candidates in a single call to
+    a similarity backend, see :mod:`~tos.graph.similarity`, by default
+    :mod:`rapidfuzz` when it is installed and computes `similarity`. Pairs
+    that can not pass `threshold` are not compared, the reference backend
+    prunes them when `similarity` is a Jaro or Jaro-Winkler similarity of
+    :mod:`jellyfish`, bounded above by the lengths and the characters in
+    common of the strings, or in `inverted` mode an edit distance of
+    :mod:`jellyfish`, bounded below by them.
+
+    Labels are clustered by the pairs of duplicates found, every label of
+    a cluster is patched to its first label in alphabetical order, so a
+    single pass of the duplicate map patches every duplicate.
+
     :param list labels: Labels to be compared
     :param function similarity: Similarity function
     :param int shared_first_letters: Only labels that share this ammount
@@ -59,34 +597,88 @@ def detect_duplicate_labels(labels,
         greater than this will be considered duplicates
     :param bool inverted: If `True` strings with `similarity`
         lower than `threshold` will be considered duplicates
+    :param str candidates: How candidate pairs are chosen, `'prefix'`,
+        `'minhash'` or `'blocks'`
+    :param int ngram_size: Length of the n-grams
+    :param int bands: Number of bands of the signatures, more bands find
+        more candidates
+    :param int rows: Number of hashes per band, more rows find fewer
+        candidates
+    :param float max_frequency: n-grams found in a larger fraction of
+        the labels are left out of the signatures
+    :param int workers: Number of processes comparing the labels, when it
+        is greater than one ranges of labels are compared with their
+        candidates in a pool of processes, the result is the same,
+        `similarity` must be picklable
+    :param bool exact_keys: If `True` labels sharing their DOI, or their
+        author, year, source, volume and page, are merged before comparing
+        them, and labels with different DOIs are never merged
+    :param fields: Parts of the labels, spares splitting them again when
+        looking for exact keys, e.g.
+        :attr:`~tos.interpreters.corpus.Corpus.fields`
+    :type fields: :class:`~tos.interpreters.labels.LabelFields`
+    :param int year_window: Largest difference between the years of the
+        labels of a block
+    :param bool same_source: If `True` labels of a block share their
+        source too
+    :param dict stats: If given, the number of pairs compared, under
+        `'compared'`, and of pairs skipped as they can not pass
+        `threshold`, under `'pruned'`, are stored in it, the latter is
+        `None` when the backend prunes pairs while scoring them, as
+        :mod:`rapidfuzz` does
+    :param backend: Similarity backend, or its name, `'auto'`, `'python'`
+        or `'rapidfuzz'`, see :func:`~tos.graph.similarity.get_backend`
+    :type backend: str or :class:`~tos.graph.similarity.SimilarityBackend`
     :returns: Duplicate map
     :rtype: dict
     """
-    sorted_labels = sorted(labels)
-    num_labels = len(sorted_labels)
-    duplicates = dict()
+    return score_pairs(
+        labels, similarity, shared_first_letters, threshold, inverted,
+        candidates, ngram_size, bands, rows, max_frequency, workers,
+        exact_keys, fields, year_window, same_source, stats, backend,
+    ).duplicates()
 
-    if inverted:
-        comp = lambda x, y: x < y
-    else:
-        comp = lambda x, y: x > y
-
-    for i in range(num_labels):
-        label = duplicates.get(sorted_labels[i], sorted_labels[i])
-        start_letters = label[:shared_first_letters]
 
-        for j in range(i + 1, num_labels):
-            other = sorted_labels[j]
+def sweep_duplicates(labels, thresholds, shared_first_letters=None,
+                     **options):
+    """Detects the duplicates of a list of labels for several thresholds,
+    and shared first letters, scoring the candidate pairs once, see
+    :func:`score_pairs`
 
-            if not other.startswith(start_letters):
-                break
+    :param list labels: Labels to be compared
+    :param list thresholds: Thresholds of the similarity
+    :param list shared_first_letters: Amounts of characters the labels
+        compared share at the beggining, the default of
+        :func:`detect_duplicate_labels` by default
+    :param options: Other arguments of :func:`detect_duplicate_labels`
+    :returns: The duplicate map of each pair of threshold and shared
+        first letters
+    :rtype: dict
+    """
+    if shared_first_letters is None:
+        shared_first_letters = [2]
+    inverted = options.get('inverted', False)
+    table = score_pairs(labels,
+                        threshold=(max if inverted else min)(thresholds),
+                        shared_first_letters=min(shared_first_letters),
+                        **options)
+    return {
+        (threshold, letters): table.duplicates(threshold, letters)
+        for threshold in thresholds for letters in shared_first_letters
+    }
 
-            sim = similarity(label, other)
 
-            if comp(sim, threshold):
-                duplicates[other] = label
+def cluster_sizes(duplicates):
+    """Counts the clusters of duplicates by their size
 
-    return duplicates
+    :param dict duplicates: Duplicate map, as returned by
+        :func:`detect_duplicate_labels`
+    :returns: number of clusters of every size, labels without duplicates
+        are left out
+    :rtype: :class:`~collections.Counter`
+    """
+    return Counter(count + 1 for count in
+                   Counter(duplicates.values()).values())
 
 
 def patch_list(items, patch):
@@ -116,3 +708,17 @@ def patch_tuple_list(items, patch):
     keys = patch_list(keys, patch)
     values = patch_list(values, patch)
     return list(zip(keys, values))
+
+
+def renumber(items):
+    """
+    Renumbers a sequence of integers into consecutive integers starting
+    from zero, in order of first appearance.
+
+    :param items: integers to be renumbered
+    :returns: Renumbered integers
+    :rtype: :class:`~array.array`
+    """
+    numbers = {}
+    return array('l', (numbers.setdefault(item, len(numbers))
+                       for item in items))
@@ -2,7 +2,37 @@
 
 """
 Several interpreters.
+
+Interpreters are imported lazily, when they are first used, see
+:mod:`~tos.interpreters.registry`.
 """
 
+import importlib
+
+from tos.interpreters.corpus import Corpus
 from tos.interpreters.interpreter import BaseInterpreter
-from tos.interpreters.isitxt import IsiInterpreter
+from tos.interpreters.labels import LabelTable
+from tos.interpreters.registry import detect_interpreter
+from tos.interpreters.registry import get_interpreter
+from tos.interpreters.registry import register_interpreter
+from tos.interpreters.registry import sniff_format
+
+_LAZY = {
+    'BibtexInterpreter': 'tos.interpreters.bibtex',
+    'IsiBibInterpreter': 'tos.interpreters.isibib',
+    'IsiInterpreter': 'tos.interpreters.isitxt',
+    'IsiRecord': 'tos.interpreters.isitxt',
+    'ScopusBibInterpreter': 'tos.interpreters.scopusbib',
+    'ScopusCsvInterpreter': 'tos.interpreters.scopustxt',
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError('module %r has no attribute %r'
+                             % (__name__, name))
+    return getattr(importlib.import_module(_LAZY[name]), name)
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY))
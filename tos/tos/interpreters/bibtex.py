@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+
+"""
+BibTeX Interpreter
+------------------
+
+Specializes the class :class:`~tos.interpreters.interpreter.BaseInterpreter`
+to tokenize BibTeX files incrementally, it is the base class of the
+interpreters of the BibTeX exports of isi web of knowledge and scopus.
+
+"""
+
+import io
+import re
+
+from collections import OrderedDict
+
+from .interpreter import BaseInterpreter
+
+_BRACES = re.compile(r'[{}]')
+# Blocks that are not entries
+_SPECIAL_ENTRIES = ('comment', 'string', 'preamble')
+_QUOTE_BRACES = re.compile(r'["{}]')
+_ESCAPES = [('{[}', '['), ('{]}', ']'), ('{\\&}', '&'), ('\\&', '&'),
+            ('\\_', '_'), ('\\%', '%'), ('\\$', '$'), ('\\#', '#')]
+
+
+def iter_bibtex_entries(handler, chunk_size=65536):
+    """Splits a BibTeX file handler into entries lazily
+
+    Reads the handler in chunks and yields the text of every entry, from
+    its `@` up to its closing brace, keeping at most one entry plus one
+    chunk in memory. Text outside the entries is ignored, and so are the
+    `@comment`, `@string` and `@preamble` blocks.
+
+    :param handler: handler for the file to be split
+    :type handler: file
+    :param int chunk_size: number of characters read at once
+    :returns: an iterator over the text of the entries
+    :rtype: iterator
+    """
+    buffer = ''
+    position = 0
+    start = -1
+    depth = 0
+
+    while True:
+        chunk = handler.read(chunk_size)
+        if not chunk:
+            break
+        # The text already split is dropped once per read
+        done = position if start == -1 else start
+        buffer = buffer[done:] + chunk
+        position -= done
+        if start != -1:
+            start = 0
+
+        while True:
+            if start == -1:
+                start = buffer.find('@', position)
+                if start == -1:
+                    position = len(buffer)
+                    break
+                position = start
+
+            match = _BRACES.search(buffer, position)
+            if match is None:
+                position = len(buffer)
+                break
+
+            position = match.end()
+            depth += 1 if match.group() == '{' else -1
+            if depth == 0:
+                entry_type = buffer[start + 1:buffer.find('{', start)]
+                if entry_type.strip().lower() not in _SPECIAL_ENTRIES:
+                    yield buffer[start:position]
+                start = -1
+
+
+def _closing(txt, position, pattern):
+    # Returns the position of the delimiter closing the one at `position`
+    depth = 0
+    for match in pattern.finditer(txt, position + 1):
+        char = match.group()
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            if depth == 0 and pattern is _BRACES:
+                return match.start()
+            depth -= 1
+        elif depth == 0:
+            return match.start()
+    return len(txt)
+
+
+def clean_bibtex_value(value):
+    """Removes the protecting braces and the escapes of a BibTeX value
+
+    :param str value: raw value of a field
+    :returns: the clean value
+    :rtype: str
+    """
+    for escaped, char in _ESCAPES:
+        if escaped in value:
+            value = value.replace(escaped, char)
+    if '{' in value:
+        value = value.replace('{', '').replace('}', '')
+    return value.strip()
+
+
+def parse_bibtex_entry(txt, fields=None):
+    """Parses the text of a BibTeX entry into a dictionary
+
+    Field names are lower cased, the entry type and key are stored under
+    `ENTRYTYPE` and `ID`.
+
+    :param str txt: the text of an entry, as yielded by
+        :func:`iter_bibtex_entries`
+    :param fields: names of the fields to keep, `None` keeps every field
+    :returns: a dictionary containing the fields of the entry
+    :rtype: dict
+    """
+    data = OrderedDict()
+    opening = txt.find('{')
+    if opening == -1:
+        return data
+
+    data['ENTRYTYPE'] = txt[txt.rfind('@', 0, opening) + 1:opening] \
+        .strip().lower()
+    comma = txt.find(',', opening)
+    if comma == -1:
+        return data
+    data['ID'] = txt[opening + 1:comma].strip()
+
+    position = comma + 1
+    end = len(txt) - 1
+
+    while position < end:
+        equals = txt.find('=', position)
+        if equals == -1:
+            break
+        name = txt[position:equals].strip(' \t\r\n,').lower()
+
+        position = equals + 1
+        while position < end and txt[position].isspace():
+            position += 1
+
+        if txt[position] == '{':
+            close = _closing(txt, position, _BRACES)
+            value = txt[position + 1:close]
+            position = close + 1
+        elif txt[position] == '"':
+            close = _closing(txt, position, _QUOTE_BRACES)
+            value = txt[position + 1:close]
+            position = close + 1
+        else:
+            close = txt.find(',', position)
+            close = end if close == -1 else close
+            value = txt[position:close]
+            position = close
+
+        if fields is None or name in fields:
+            data[name] = clean_bibtex_value(value)
+
+    return data
+
+
+class BibtexInterpreter(BaseInterpreter):
+
+    """Base class of the BibTeX interpreters
+
+    Entries are parsed into dictionaries of lower cased field names,
+    subclasses know how to label them.
+
+    :param fields: names of the fields to keep, `None` keeps every field
+    """
+
+    def __init__(self, fields=None):
+        super(BibtexInterpreter, self).__init__()
+        self.fields = None if fields is None else frozenset(fields)
+
+    def split_entries(self, txt):
+        """This function splits text into single entries
+
+        :param txt: Text to split
+        :type txt: str
+        :returns: list of strings containing each entry
+        :rtype: list
+        """
+        return list(self.iter_entries(io.StringIO(txt)))
+
+    def iter_entries(self, handler):
+        """Splits a file handler into single entries reading it in chunks
+
+        :param handler: handler for the file to be split
+        :type handler: file
+        :returns: an iterator over strings containing each entry
+        :rtype: iterator
+        """
+        return iter_bibtex_entries(handler)
+
+    def parse_entry(self, txt):
+        """Parses an individual entry and returns a structured dict
+
+        :param txt: An individual entry
+        :type txt: str
+        :returns: a dictionary containg metadata
+        :rtype: dict
+        """
+        return parse_bibtex_entry(txt, self.fields)
@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+
+"""
+Cache
+-----
+
+Contains the :class:`~tos.interpreters.cache.CorpusCache`, an on disk cache
+of the corpora built out of input files, so rebuilding a tree of an
+already seen export skips parsing it.
+
+"""
+
+import hashlib
+import os
+import struct
+import sys
+import tempfile
+
+from array import array
+
+from .corpus import Corpus
+from .labels import LabelTable
+from .sources import list_files
+
+_MAGIC = b'TOSC'
+_FORMAT = 2
+# Magic, format, byte order, item size, labels, labels size, edges, records
+# and records size
+_HEADER = struct.Struct('<4sBcBQQQQQ')
+_SUFFIX = '.corpus'
+
+
+def _configuration(interpreter):
+    # Public attributes of an interpreter, as set by its arguments, and not
+    # methods patched on the instance, sets are sorted so their
+    # representation does not vary between runs
+    items = []
+    for name, value in sorted(vars(interpreter).items()):
+        if (name.startswith('_') or callable(value) or
+                callable(getattr(type(interpreter), name, None))):
+            continue
+        if isinstance(value, (set, frozenset)):
+            value = sorted(value)
+        items.append((name, value))
+    return repr(items)
+
+
+def corpus_keys(interpreter, sources, key=None):
+    """Computes the cache keys of the corpora built out of the first
+    sources, the key of each corpus is chained to the key of the previous
+    one, see :func:`corpus_key`
+
+    :param interpreter: interpreter building the corpora
+    :type interpreter: :class:`~tos.interpreters.interpreter.BaseInterpreter`
+    :param list sources: paths of the input files, `bytes` are taken as the
+        contents of an input
+    :param str key: key of the corpus the sources are appended to, the
+        empty corpus by default
+    :returns: hexadecimal keys, the first one is the key of the corpus the
+        sources are appended to and the last one the key of the corpus of
+        every source
+    :rtype: list
+    """
+    if key is None:
+        cls = type(interpreter)
+        key = hashlib.sha256(('%s.%s:%s:%s' % (
+            cls.__module__, cls.__qualname__, interpreter.version,
+            _configuration(interpreter),
+        )).encode()).hexdigest()
+    keys = [key]
+
+    for source in sources:
+        digest = hashlib.sha256(keys[-1].encode())
+        if isinstance(source, bytes):
+            digest.update(struct.pack('<Q', len(source)))
+            digest.update(source)
+        else:
+            digest.update(struct.pack('<Q', os.path.getsize(source)))
+            with open(source, 'rb') as handler:
+                for chunk in iter(lambda: handler.read(1 << 20), b''):
+                    digest.update(chunk)
+        keys.append(digest.hexdigest())
+
+    return keys
+
+
+def corpus_key(interpreter, sources):
+    """Computes the cache key of the corpus built out of some inputs
+
+    The key is the SHA-256 digest of the inputs, as stored so compressed
+    files are not decompressed, along with the class, the version and the
+    configuration of the interpreter, e.g. the fields it keeps. Inputs are
+    hashed one after another, so the keys of the corpora of the first
+    inputs come along, see :func:`corpus_keys`.
+
+    :param interpreter: interpreter building the corpus
+    :type interpreter: :class:`~tos.interpreters.interpreter.BaseInterpreter`
+    :param list sources: paths of the input files, `bytes` are taken as the
+        contents of an input
+    :returns: hexadecimal key
+    :rtype: str
+    """
+    return corpus_keys(interpreter, sources)[-1]
+
+
+def _join(strings):
+    # Strings are joined by null characters, that do not show up in labels
+    # nor identifiers
+    joined = '\0'.join(strings)
+    if joined.count('\0') != max(len(strings) - 1, 0):
+        return None
+    return joined.encode('utf-8')
+
+
+def _split(data, count):
+    return str(data, 'utf-8').split('\0') if count else []
+
+
+def _encode(corpus):
+    labels = _join(corpus.labels.labels)
+    records = _join(sorted(corpus.records))
+    if labels is None or records is None:
+        return None
+    header = _HEADER.pack(_MAGIC, _FORMAT, sys.byteorder[0].encode(),
+                          corpus.sources.itemsize, len(corpus.labels),
+                          len(labels), len(corpus.sources),
+                          len(corpus.records), len(records))
+    return [header, labels, corpus.sources.tobytes(),
+            corpus.targets.tobytes(), records]
+
+
+def _decode(data):
+    if len(data) < _HEADER.size:
+        return None
+    (magic, version, byteorder, itemsize, count, size, edges, records,
+     records_size) = _HEADER.unpack_from(data)
+    if (magic != _MAGIC or version != _FORMAT or
+            byteorder != sys.byteorder[0].encode() or
+            itemsize != array('l').itemsize or
+            len(data) != (_HEADER.size + size + 2 * edges * itemsize +
+                          records_size)):
+        return None
+
+    view = memoryview(data)
+    start = _HEADER.size
+    labels = _split(view[start:start + size], count)
+    start += size
+    sources = array('l')
+    sources.frombytes(view[start:start + edges * itemsize])
+    start += edges * itemsize
+    targets = array('l')
+    targets.frombytes(view[start:start + edges * itemsize])
+    start += edges * itemsize
+
+    table = LabelTable()
+    table.labels = labels
+    table.identifiers = dict(zip(labels, range(len(labels))))
+    return Corpus(table, sources, targets,
+                  set(_split(view[start:], records)))
+
+
+class CorpusCache(object):
+
+    """On disk cache of corpora keyed by the contents of their inputs
+
+    Each corpus, its label table and its edge arrays, is stored in a
+    compact binary file that loads without parsing anything. Files are
+    written atomically, so several processes may share the cache, and the
+    least recently used ones are evicted once the cache outgrows
+    `max_size`.
+
+    :param str directory: directory holding the cache files, it is created
+        if needed
+    :param int max_size: size cap of the cache in bytes
+    """
+
+    def __init__(self, directory, max_size=1 << 30):
+        super(CorpusCache, self).__init__()
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        """Returns the path of the file of a cached corpus
+
+        :param str key: cache key, see :func:`corpus_key`
+        :rtype: str
+        """
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def load(self, key):
+        """Loads a cached corpus marking it as recently used
+
+        :param str key: cache key, see :func:`corpus_key`
+        :returns: the cached corpus, `None` when it is not in the cache or
+            its file can not be decoded, the file is removed then
+        :rtype: :class:`~tos.interpreters.corpus.Corpus`
+        """
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as handler:
+                data = handler.read()
+            os.utime(path)
+        except OSError:
+            return None
+
+        try:
+            corpus = _decode(data)
+        except (ValueError, struct.error):
+            # Undecodable labels or truncated arrays
+            corpus = None
+        if corpus is None:
+            # Corrupt files are misses, they are written again
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        return corpus
+
+    def store(self, key, corpus):
+        """Stores a corpus and evicts the least recently used ones
+
+        :param str key: cache key, see :func:`corpus_key`
+        :param corpus: corpus to be stored
+        :type corpus: :class:`~tos.interpreters.corpus.Corpus`
+        """
+        parts = _encode(corpus)
+        if parts is None:
+            return
+
+        handle, temporary = tempfile.mkstemp(dir=self.directory,
+                                             suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as handler:
+                for part in parts:
+                    handler.write(part)
+            os.replace(temporary, self.path(key))
+        except OSError:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+
+        self.evict()
+
+    def evict(self):
+        """Removes the least recently used corpora until the cache fits in
+        :attr:`max_size`
+        """
+        files = []
+        for path in list_files(self.directory):
+            if not path.endswith(_SUFFIX):
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        size = sum(file_size for _, file_size, _ in files)
+        for _, file_size, path in sorted(files):
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            size -= file_size
+
+    def append(self, key, interpreter, sources):
+        """Appends the entries of some input files to a cached corpus
+
+        Only the input files are parsed, their records already in the
+        corpus are skipped, and the result is cached under the key chained
+        to `key`, see :func:`corpus_keys`.
+
+        :param str key: key of the cached corpus, see :func:`corpus_key`
+        :param interpreter: interpreter building the corpus
+        :type interpreter:
+            :class:`~tos.interpreters.interpreter.BaseInterpreter`
+        :param list sources: paths of the new input files
+        :returns: the key of the resulting corpus and the corpus
+        :rtype: tuple
+        :raises KeyError: when the corpus is not in the cache
+        """
+        corpus = self.load(key)
+        if corpus is None:
+            raise KeyError(key)
+        key = corpus_keys(interpreter, sources, key)[-1]
+        corpus = interpreter.build_corpus(
+            interpreter.iter_parse_files(sources), corpus)
+        self.store(key, corpus)
+        return key, corpus
+
+    def build_corpus(self, interpreter, sources):
+        """Loads the corpus of some input files, building it if needed
+
+        When only the corpus of the first files is cached, as it happens
+        when files are added to a query, it is loaded and the remaining
+        files are appended to it, so they are the only files parsed.
+
+        :param interpreter: interpreter building the corpus
+        :type interpreter:
+            :class:`~tos.interpreters.interpreter.BaseInterpreter`
+        :param sources: paths of the input files, or the path of a
+            directory whose files are parsed in name order
+        :type sources: list or str
+        :returns: the corpus of the input files
+        :rtype: :class:`~tos.interpreters.corpus.Corpus`
+        """
+        if isinstance(sources, str):
+            sources = list_files(sources)
+        keys = corpus_keys(interpreter, sources)
+
+        for done in range(len(sources), 0, -1):
+            corpus = self.load(keys[done])
+            if corpus is not None:
+                break
+        else:
+            done, corpus = 0, None
+
+        if done < len(sources):
+            corpus = interpreter.build_corpus(
+                interpreter.iter_parse_files(sources[done:]), corpus)
+            self.store(keys[-1], corpus)
+        return corpus
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+"""
+Corpus
+------
+
+Contains the :class:`~tos.interpreters.corpus.Corpus` which holds the
+unique labels of a set of entries along with the edge relations among
+them, as computed by
+:meth:`~tos.interpreters.interpreter.BaseInterpreter.build_corpus`.
+
+"""
+
+from array import array
+
+from .labels import LabelFields
+from .labels import LabelTable
+
+
+class Corpus(object):
+
+    """Labels and edge relations of a set of entries
+
+    Labels are interned in a :class:`~tos.interpreters.labels.LabelTable`
+    and the edge relations are kept as two arrays of label identifiers,
+    an edge goes from ``sources[i]`` to ``targets[i]``. The identifiers of
+    the records added so far are kept in :attr:`records`, so new entries
+    can be appended later on skipping the records already in the corpus.
+
+    :param labels: label table, a new one is created if not given
+    :type labels: :class:`~tos.interpreters.labels.LabelTable`
+    :param sources: identifiers of the citing labels
+    :param targets: identifiers of the cited labels
+    :param set records: identifiers of the records in the corpus
+    """
+
+    def __init__(self, labels=None, sources=None, targets=None,
+                 records=None):
+        super(Corpus, self).__init__()
+        self.labels = LabelTable() if labels is None else labels
+        self.sources = array('l') if sources is None else sources
+        self.targets = array('l') if targets is None else targets
+        self.records = set() if records is None else records
+        self._fields = LabelFields()
+
+    @property
+    def fields(self):
+        """Parts of the labels, see
+        :class:`~tos.interpreters.labels.LabelFields`, the labels are split
+        the first time they are needed, and once
+
+        :rtype: :class:`~tos.interpreters.labels.LabelFields`
+        """
+        self._fields.extend(self.labels.labels[len(self._fields):])
+        return self._fields
+
+    def add(self, label, references):
+        """Adds an entry's label along with its referenced labels
+
+        :param str label: entry's label
+        :param list references: entry's referenced labels
+        """
+        source = self.labels.intern(label)
+        targets = self.labels.intern_all(references)
+        self.sources.extend([source] * len(targets))
+        self.targets.extend(targets)
+
+    def extend(self, other):
+        """Appends the labels, the edge relations and the records of
+        another corpus, as if its entries were added one by one
+
+        :param other: corpus to be appended, none of its records may be in
+            this corpus
+        :type other: :class:`~tos.interpreters.corpus.Corpus`
+        """
+        identifiers = self.labels.intern_all(other.labels.labels)
+        self.sources.extend(map(identifiers.__getitem__, other.sources))
+        self.targets.extend(map(identifiers.__getitem__, other.targets))
+        self.records.update(other.records)
+
+    def edge_relations(self):
+        """Returns the edge list in terms of labels
+
+        :returns: Edge list of the form `[(label_source, label_target), ...]`
+        :rtype: list
+        """
+        labels = self.labels.labels
+        return list(zip(map(labels.__getitem__, self.sources),
+                        map(labels.__getitem__, self.targets)))
@@ -9,8 +9,63 @@ which is an intepreter abstract base class.
 
 """
 
+import io
+
 from abc import ABCMeta
 from abc import abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+from itertools import repeat
+
+from .corpus import Corpus
+from .sources import iter_streams
+from .sources import list_files
+from .sources import open_text
+
+
+def iter_split(handler, separator, chunk_size=65536):
+    """Splits the contents of a file handler lazily
+
+    Reads the handler in chunks of `chunk_size` and yields the pieces
+    found between occurrences of `separator`, just like
+    ``handler.read().split(separator)[:-1]`` would, but keeping at most
+    one piece plus one chunk in memory.
+
+    :param handler: handler for the file to be split
+    :type handler: file
+    :param separator: separator, must be of the same type the handler
+        reads (`str` or `bytes`)
+    :param int chunk_size: number of characters read at once
+    :returns: an iterator over the pieces
+    :rtype: iterator
+    """
+    buffer = separator[:0]
+
+    while True:
+        chunk = handler.read(chunk_size)
+        if not chunk:
+            break
+        buffer += chunk
+        if separator not in buffer:
+            continue
+        pieces = buffer.split(separator)
+        buffer = pieces.pop()
+        yield from pieces
+
+
+# Text parsed by the worker processes of BaseInterpreter.parse_corpus, it
+# is handed to them once as they start, inherited when they are forked,
+# and the tasks just hold the bounds of their chunks
+_worker_text = None
+
+
+def _share_text(txt):
+    global _worker_text
+    _worker_text = txt
+
+
+def _parse_text_range(interpreter, start, stop):
+    return interpreter.parse_corpus(_worker_text[start:stop])
 
 
 class BaseInterpreter(object, metaclass=ABCMeta):
@@ -19,29 +74,215 @@ class BaseInterpreter(object, metaclass=ABCMeta):
 
     # __metaclass__ = ABCMeta
 
-    def parse_file(self, handler):
+    #: Number of chunks per process when parsing in parallel, several
+    #: chunks per process balance the load of uneven records
+    chunks_per_worker = 4
+
+    #: Version of the labels computed by the interpreter, it must be bumped
+    #: whenever they change since it invalidates the cached corpora, see
+    #: :class:`~tos.interpreters.cache.CorpusCache`
+    version = 1
+
+    def parse_file(self, handler, workers=None):
         """Proxy for parsing a file handler
 
+        Binary handlers may hold gzip, bz2, xz or zip compressed contents,
+        which are decompressed while parsed, see
+        :func:`~tos.interpreters.sources.iter_streams`.
+
         :param handler: hendler for the file to be parsed
         :type handler: file
+        :param int workers: number of processes used to parse the file,
+            see :meth:`parse`, the file is streamed when it is not given
         :returns: a list of dictionaries containing parsed metadata
         :rtype: list
         """
-        return self.parse(handler.read())
+        if workers is not None and workers > 1:
+            if isinstance(handler, io.TextIOBase):
+                return self.parse(handler.read(), workers=workers)
+            entries = []
+            for stream in iter_streams(handler):
+                with open_text(stream) as text:
+                    entries.extend(self.parse(text.read(), workers))
+            return entries
+        if isinstance(handler, io.TextIOBase):
+            return list(self.iter_parse(handler))
+        return list(self.iter_parse_mapped(handler))
+
+    def iter_entries(self, handler):
+        """Splits a file handler into individual entries lazily
+
+        The default implementation reads the whole file, subclasses
+        should override it in order to read the file in chunks.
+
+        :param handler: handler for the file to be split
+        :type handler: file
+        :returns: an iterator over the individual entries
+        :rtype: iterator
+        """
+        return iter(self.split_entries(handler.read()))
+
+    def iter_parse(self, handler):
+        """Parses a file handler yielding one entry at a time
+
+        :param handler: handler for the file to be parsed
+        :type handler: file
+        :returns: an iterator over dictionaries containing parsed metadata
+        :rtype: iterator
+        """
+        return map(self.parse_entry, self.iter_entries(handler))
+
+    def iter_parse_mapped(self, source):
+        """Parses a path or a binary file yielding one entry at a time
+
+        The default implementation decodes the file as an utf-8 text
+        stream, decompressing it when needed and translating its line
+        endings, see :func:`~tos.interpreters.sources.open_text`,
+        subclasses should override
+        it in order to scan the raw bytes of the file, possibly through a
+        memory map.
+
+        :param source: path or handler of the file to be parsed
+        :type source: str or file
+        :returns: an iterator over dictionaries containing parsed metadata
+        :rtype: iterator
+        """
+        if isinstance(source, io.TextIOBase):
+            yield from self.iter_parse(source)
+            return
+
+        for stream in iter_streams(source):
+            with open_text(stream) as text:
+                yield from self.iter_parse(text)
+
+    def iter_parse_files(self, sources):
+        """Parses several files in sequence yielding one entry at a time
+
+        Files are parsed through :meth:`iter_parse_mapped`, except for
+        text handlers, and duplicate entries are dropped using
+        :meth:`unique_entries`.
+
+        :param sources: paths or handlers of the files to be parsed, or the
+            path of a directory whose files are parsed in name order
+        :type sources: list or str
+        :returns: an iterator over dictionaries containing parsed metadata
+        :rtype: iterator
+        """
+        if isinstance(sources, str):
+            sources = list_files(sources)
+
+        def entries():
+            for source in sources:
+                if isinstance(source, io.TextIOBase):
+                    yield from self.iter_parse(source)
+                else:
+                    yield from self.iter_parse_mapped(source)
+
+        return self.unique_entries(entries())
+
+    def unique_entries(self, entries):
+        """Drops the entries whose identifier was already seen
+
+        Entries without identifier, see :meth:`get_entry_id`, are kept.
+
+        :param entries: entries containing anotated data
+        :returns: an iterator over the unique entries
+        :rtype: iterator
+        """
+        seen = set()
 
-    def parse(self, txt):
+        for entry in entries:
+            identifier = self.get_entry_id(entry)
+            if identifier is not None:
+                if identifier in seen:
+                    continue
+                seen.add(identifier)
+            yield entry
+
+    def parse(self, txt, workers=None):
         """Parses a string with one or more records
 
         Load a string with multiple records, split them into
         entries and parse the entries.
 
+        When `workers` is greater than one the text is cut into chunks
+        holding whole records using :meth:`split_chunks`, and the chunks
+        are parsed in a pool of processes, the entries are returned in
+        their original order anyway. Note that the entries are pickled
+        back from the workers, which usually costs more than parsing them,
+        the default is to parse in this process, and :meth:`parse_corpus`
+        should be used in parallel when only the corpus is needed.
+
         :param txt: text to be parsed
         :type txt: str
+        :param int workers: number of processes used to parse the text
         :returns: a list of dictionaries containing parsed metadata
         :rtype: list
         """
-        entries = self.split_entries(txt)
-        return list(map(self.parse_entry, entries))
+        if workers is None or workers < 2:
+            entries = self.split_entries(txt)
+            return list(map(self.parse_entry, entries))
+
+        chunks = self.split_chunks(txt, workers * self.chunks_per_worker)
+        with ProcessPoolExecutor(workers) as executor:
+            parsed = executor.map(self.parse, chunks)
+            return [entry for chunk in parsed for entry in chunk]
+
+    def parse_corpus(self, txt, workers=None, corpus=None):
+        """Parses a string with one or more records into a corpus, see
+        :meth:`build_corpus`
+
+        When `workers` is greater than one the chunks of the text, see
+        :meth:`split_chunks`, are turned into corpora in a pool of
+        processes, which get the text once rather than chunk by chunk and
+        send back just the labels of each chunk, once, and the edge
+        relations as arrays, rather than the entries. The
+        corpora of the chunks are appended in order, so the corpus is the
+        same as the one built in this process.
+
+        :param txt: text to be parsed
+        :type txt: str
+        :param int workers: number of processes used to parse the text
+        :param corpus: corpus the entries are appended to
+        :type corpus: :class:`~tos.interpreters.corpus.Corpus`
+        :returns: the labels and the edge relations of the entries
+        :rtype: :class:`~tos.interpreters.corpus.Corpus`
+        """
+        if workers is None or workers < 2:
+            return self.build_corpus(self.parse(txt), corpus)
+
+        corpus = Corpus() if corpus is None else corpus
+        chunks = self.split_chunks(txt, workers * self.chunks_per_worker)
+        stops = list(accumulate(map(len, chunks)))
+        with ProcessPoolExecutor(workers, initializer=_share_text,
+                                 initargs=(txt, )) as executor:
+            parts = executor.map(_parse_text_range, repeat(self),
+                                 [0] + stops[:-1], stops)
+            for chunk, part in zip(chunks, parts):
+                if corpus.records.isdisjoint(part.records):
+                    corpus.extend(part)
+                else:
+                    # Records already in the corpus are skipped one entry
+                    # at a time
+                    self.build_corpus(self.parse(chunk), corpus)
+
+        return corpus
+
+    def split_chunks(self, txt, count):
+        """Splits text into chunks holding whole records
+
+        The chunks must be parseable on their own using :meth:`parse`.
+        The default implementation returns the whole text as a single
+        chunk, subclasses should override it in order to allow parallel
+        parsing.
+
+        :param txt: text to be split
+        :type txt: str
+        :param int count: desired number of chunks
+        :returns: list of strings containing whole records
+        :rtype: list
+        """
+        return [txt]
 
     @abstractmethod
     def split_entries(self, txt):
@@ -64,6 +305,19 @@ class BaseInterpreter(object, metaclass=ABCMeta):
         out of an entry's metadata.
         """
 
+    def get_entry_id(self, entry):
+        """Returns an identifier of the record behind an entry
+
+        Entries sharing an identifier are duplicates of the same record,
+        the default implementation returns `None` meaning the entry can not
+        be identified.
+
+        :param dict entry: Entry to be identified
+        :returns: Entry's identifier
+        :rtype: str
+        """
+        return None
+
     def get_label_list(self, entries):
         """Computes a list of unique entry labels
 
@@ -80,3 +334,34 @@ class BaseInterpreter(object, metaclass=ABCMeta):
             labels.extend(self.get_referenced_labels(entry))
 
         return sorted(list(set(labels)))
+
+    def build_corpus(self, entries, corpus=None):
+        """Computes the unique labels and the edge relations of the entries
+
+        Walks the entries once, computing each entry's label and
+        referenced labels a single time, so `entries` can be any iterable,
+        such as the one returned by :meth:`iter_parse`.
+
+        When a corpus is given the entries are appended to it in place,
+        entries whose record, see :meth:`get_entry_id`, is already in the
+        corpus are skipped before computing their labels.
+
+        :param entries: entries containing anotated data
+        :param corpus: corpus the entries are appended to
+        :type corpus: :class:`~tos.interpreters.corpus.Corpus`
+        :returns: the labels and the edge relations of the entries
+        :rtype: :class:`~tos.interpreters.corpus.Corpus`
+        """
+        corpus = Corpus() if corpus is None else corpus
+        records = corpus.records
+
+        for entry in entries:
+            record = self.get_entry_id(entry)
+            if record is not None:
+                if record in records:
+                    continue
+                records.add(record)
+            corpus.add(self.get_entry_label(entry),
+                       self.get_referenced_labels(entry))
+
+        return corpus
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+"""
+Isi BibTeX Interpreter
+----------------------
+
+Specializes the class :class:`~tos.interpreters.bibtex.BibtexInterpreter`
+to interpret the isi web of knowledge BibTeX file format, labels match the
+ones of :class:`~tos.interpreters.isitxt.IsiInterpreter`.
+
+"""
+
+import re
+
+from .bibtex import BibtexInterpreter
+from .labels import format_author
+from .labels import format_label
+from .labels import format_source
+
+#: Fields used to compute the entry label, the referenced labels and the
+#: entry identifier
+RECORD_FIELDS = ('author', 'year', 'journal-iso', 'journal', 'volume',
+                 'pages', 'article-number', 'doi', 'cited-references',
+                 'unique-id')
+
+_NAMES = re.compile(r'[\s.\-]+')
+
+
+def get_isi_author(author):
+    """Writes an author of a BibTeX author list the way isi does
+
+    :param str author: an author as `Surname, Given Names`
+    :returns: author as `Surname IN`
+    :rtype: str
+    """
+    surname, _, names = author.partition(',')
+    initials = ''.join(name[0] for name in _NAMES.split(names) if name)
+    return format_author(surname.strip(), initials.upper())
+
+
+class IsiBibInterpreter(BibtexInterpreter):
+
+    """Interpreter for the isi web of knowledge BibTeX export
+
+    :param fields: names of the fields to keep, `None` keeps every field,
+        it defaults to the fields needed to label and identify the entries
+    """
+
+    def __init__(self, fields=RECORD_FIELDS):
+        super(IsiBibInterpreter, self).__init__(fields)
+
+    def get_entry_id(self, entry):
+        """Returns the accession number of an entry
+
+        :param dict entry: Entry to be identified
+        :returns: Entry's accession number, `None` if it is missing
+        :rtype: str
+        """
+        return entry.get('unique-id')
+
+    def get_entry_label(self, entry):
+        """Returns and entry label acording to its metadata
+
+        :param dict entry: Entry to be labeled
+        :returns: Entry's label
+        :rtype: str
+        """
+        author = entry.get('author', '').split(' and ')[0]
+        source = entry.get('journal-iso') or entry.get('journal', '')
+        return format_label(
+            get_isi_author(author),
+            entry.get('year', ''),
+            format_source(source),
+            entry.get('volume', ''),
+            entry.get('pages', '').split('-')[0],
+            entry.get('doi', ''),
+            entry.get('article-number', ''),
+        )
+
+    def get_referenced_labels(self, entry):
+        """Returns the references of an entry translated to labels
+
+        Cited references are already written as labels, one per line.
+
+        :param dict entry: Entry to extract the references from
+        :returns: Entry's reference list as labels
+        :rtype: list
+        """
+        references = []
+
+        for line in entry.get('cited-references', '').split('\n'):
+            line = line.strip()
+            if line.endswith('.'):
+                line = line[:-1]
+            if line:
+                references.append(line)
+
+        return references
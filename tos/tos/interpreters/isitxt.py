@@ -9,20 +9,111 @@ to interpret the isi web of knowledge plain text file format.
 
 """
 
-import re
+import io
+import mmap
+
 from collections import OrderedDict
+from collections.abc import Mapping
 
 from .interpreter import BaseInterpreter
+from .interpreter import iter_split
+from .sources import detect_compression
+from .sources import iter_streams
+from .sources import open_text
+
+_TAG_CHARS = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789')
+_TAG_BYTES = frozenset(char.encode() for char in _TAG_CHARS)
+
+#: Tags used to compute the entry label and the referenced labels
+LABEL_FIELDS = ('AU', 'PY', 'J9', 'VL', 'BP', 'AR', 'DI', 'CR')
+
+#: Label tags along with the accession number identifying the record
+RECORD_FIELDS = LABEL_FIELDS + ('UT', )
+
+
+class IsiRecord(object):
+
+    """Compact record holding only the label fields of an entry
+
+    It behaves as a read only dictionary of the fields present in the
+    entry, which is everything
+    :meth:`~tos.interpreters.isitxt.IsiInterpreter.get_entry_label`,
+    :meth:`~tos.interpreters.isitxt.IsiInterpreter.get_referenced_labels`
+    and :meth:`~tos.interpreters.isitxt.IsiInterpreter.get_entry_id` need,
+    while taking a fraction of the memory of a dictionary.
+    """
+
+    __slots__ = RECORD_FIELDS
+
+    def __init__(self, data):
+        for field in self.__slots__:
+            if field in data:
+                setattr(self, field, data[field])
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self.__slots__ and hasattr(self, key)
+
+    def __iter__(self):
+        return (field for field in self.__slots__ if hasattr(self, field))
+
+    def __len__(self):
+        return sum(1 for field in self)
+
+    def __eq__(self, other):
+        if not isinstance(other, (Mapping, IsiRecord)):
+            return NotImplemented
+        return dict(self.items()) == dict(other.items())
+
+    # Records are mutable through their slots, they are not hashable
+    __hash__ = None
+
+    def __repr__(self):
+        return '%s(%r)' % (type(self).__name__, dict(self.items()))
+
+    def get(self, key, default=None):
+        """Returns the value of a field or `default` if it is missing"""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        """Returns the fields present in the record"""
+        return list(self)
+
+    def items(self):
+        """Returns the `(field, value)` pairs present in the record"""
+        return [(field, getattr(self, field)) for field in self]
 
 
 class IsiInterpreter(BaseInterpreter):
 
-    """docstring for IsiInterpter"""
+    """docstring for IsiInterpter
 
-    def __init__(self):
+    :param fields: tags of the sections to keep, the remaining sections
+        are skipped while tokenizing, `None` keeps every section, it
+        defaults to :attr:`label_fields` and the accession number `UT`
+    :param bool compact: if `True` entries are parsed into
+        :class:`~tos.interpreters.isitxt.IsiRecord` instances holding only
+        the label fields, instead of dictionaries holding every section
+    """
+
+    #: Tags used to compute the entry label and the referenced labels
+    label_fields = LABEL_FIELDS
+
+    def __init__(self, fields=RECORD_FIELDS, compact=False):
         super(IsiInterpreter, self).__init__()
         self.entry_separator = '\nER\n\n'
-        self.head_line = re.compile(r'(?P<head>[A-Z0-9]{2})\s(?P<line>.+)')
+        self.fields = None if fields is None else frozenset(fields)
+        self.compact = compact
 
     def split_entries(self, txt):
         """This function splits text into single entries
@@ -34,39 +125,188 @@ class IsiInterpreter(BaseInterpreter):
         """
         return txt.split(self.entry_separator)[:-1]
 
+    def split_chunks(self, txt, count):
+        """Splits text into about `count` chunks of similar size
+
+        Every chunk but the last one ends right after an entry separator,
+        so chunks can be parsed independently.
+
+        :param txt: Text to split
+        :type txt: str
+        :param int count: desired number of chunks
+        :returns: list of strings containing whole entries
+        :rtype: list
+        """
+        size = len(txt) // max(count, 1) + 1
+        chunks = []
+        start = 0
+
+        while start < len(txt):
+            end = txt.find(self.entry_separator, start + size)
+            if end == -1:
+                chunks.append(txt[start:])
+                break
+            end += len(self.entry_separator)
+            chunks.append(txt[start:end])
+            start = end
+
+        return chunks
+
+    def iter_entries(self, handler):
+        """Splits a file handler into single entries reading it in chunks
+
+        :param handler: handler for the file to be split
+        :type handler: file
+        :returns: an iterator over strings containing each entry
+        :rtype: iterator
+        """
+        return iter_split(handler, self.entry_separator)
+
     def parse_entry(self, txt):
         """Parses an individual entry and returns a structured dict
 
+        Tags are detected by looking at the first two columns of every
+        line, lines without a tag continue the section above them. A
+        section spanning a single line is stored as a string and a section
+        spanning several lines as a list of strings. Sections not in
+        :attr:`fields` are skipped.
+
         :param txt: An individual entry
         :type txt: str
-        :returns: a dictionary containg metadata
+        :returns: a dictionary containg metadata, or an
+            :class:`~tos.interpreters.isitxt.IsiRecord` if the interpreter
+            is compact
         :rtype: dict
         """
-        lines = txt.split('\n')
         data = OrderedDict()
         section = "UNKW"
+        fields = self.fields
+        keep = fields is None or section in fields
+        tag_chars = _TAG_CHARS
+        # Lines of the current section, None while it is a single line
+        values = None
 
-        for line, next in zip(lines, lines[1:] + ['']):
-            # Split etries took care of this
-            # if line == 'EF':
-            #     break
-
-            match_line = self.head_line.match(line)
-            match_next = self.head_line.match(next)
-            if match_line is not None:
-                section = match_line.group('head')
-                if match_next is not None or next == '':
-                    data[section] = match_line.group('line')
-                else:
-                    data[section] = [match_line.group('line')]
+        for line in txt.split('\n'):
+            if (line[:1] in tag_chars and line[1:2] in tag_chars and
+                    line[2:3].isspace() and len(line) > 3):
+                section = line[:2]
+                keep = fields is None or section in fields
+                if keep:
+                    data[section] = line[3:]
+                values = None
+            elif not keep:
+                continue
+            elif values is not None:
+                values.append(line.strip())
+            elif section in data:
+                values = data[section] = [data[section], line.strip()]
             else:
-                if section in data:
-                    data[section].append(line.strip())
-                else:
-                    data[section] = [line.strip()]
+                values = data[section] = [line.strip()]
 
+        if self.compact:
+            return IsiRecord(data)
         return data
 
+    def iter_parse_mapped(self, source):
+        """Parses a path or a binary file yielding one entry at a time
+
+        The file is memory mapped and scanned as raw bytes, only the
+        sections listed in :attr:`fields` are decoded, so the decoded
+        data is a fraction of the file. Non seekable streams, such as
+        pipes, and compressed files, see
+        :func:`~tos.interpreters.sources.iter_streams`, are decoded in
+        chunks instead, translating their line endings.
+
+        :param source: path or handler of the file to be parsed
+        :type source: str or file
+        :returns: an iterator over dictionaries containing parsed metadata
+        :rtype: iterator
+        """
+        if isinstance(source, str):
+            with open(source, 'rb') as handler:
+                yield from self.iter_parse_mapped(handler)
+            return
+
+        # Text handlers expose the underlying binary stream
+        handler = getattr(source, 'buffer', source)
+        if detect_compression(handler) is not None:
+            for stream in iter_streams(handler):
+                yield from self._iter_parse_stream(stream)
+            return
+
+        try:
+            buffer = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+            yield from self._iter_parse_stream(handler)
+            return
+
+        newline = b'\r\n' if b'\r\n' in buffer[:65536] else b'\n'
+        separator = self.entry_separator.encode().replace(b'\n', newline)
+
+        try:
+            for record in _iter_mapped_records(buffer, separator):
+                yield self.parse_entry_bytes(record, newline)
+        finally:
+            buffer.close()
+
+    def _iter_parse_stream(self, handler):
+        # Parses a binary stream reading it in chunks, they are decoded so
+        # their line endings are translated whether the stream can be
+        # peeked or not
+        with open_text(handler) as text:
+            yield from self.iter_parse(text)
+
+    def parse_entry_bytes(self, record, newline=b'\n'):
+        """Parses an individual raw entry decoding only the kept sections
+
+        Works as :meth:`parse_entry` but on undecoded bytes, lines of the
+        sections that are not in :attr:`fields` are skipped without
+        decoding them.
+
+        :param bytes record: An individual entry encoded as utf-8
+        :param bytes newline: Line separator of the entry
+        :returns: a dictionary containg metadata, or an
+            :class:`~tos.interpreters.isitxt.IsiRecord` if the interpreter
+            is compact
+        :rtype: dict
+        """
+        data = OrderedDict()
+        section = "UNKW"
+        fields = self.fields
+        keep = fields is None or section in fields
+        tag_chars = _TAG_BYTES
+        values = None
+
+        for line in record.split(newline):
+            if (line[:1] in tag_chars and line[1:2] in tag_chars and
+                    line[2:3].isspace() and len(line) > 3):
+                section = line[:2].decode()
+                keep = fields is None or section in fields
+                if keep:
+                    data[section] = line[3:].decode()
+                values = None
+            elif not keep:
+                continue
+            elif values is not None:
+                values.append(line.decode().strip())
+            elif section in data:
+                values = data[section] = [data[section], line.decode().strip()]
+            else:
+                values = data[section] = [line.decode().strip()]
+
+        if self.compact:
+            return IsiRecord(data)
+        return data
+
+    def get_entry_id(self, entry):
+        """Returns the accession number of an entry
+
+        :param dict entry: Entry to be identified
+        :returns: Entry's accession number, `None` if it is missing
+        :rtype: str
+        """
+        return entry.get('UT')
+
     def get_entry_label(self, entry):
         """Returns and entry label acording to its metadata
 
@@ -117,3 +357,14 @@ class IsiInterpreter(BaseInterpreter):
                 return references
         else:
             return []
+
+
+def _iter_mapped_records(buffer, separator):
+    start = 0
+
+    while True:
+        end = buffer.find(separator, start)
+        if end == -1:
+            break
+        yield buffer[start:end]
+        start = end + len(separator)
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+
+"""
+Labels
+------
+
+Contains the :class:`~tos.interpreters.labels.LabelTable` which interns
+labels as integer identifiers, so they can be hashed and stored once and
+handled as integers afterwards, and helpers to write labels in the format
+of the isi cited references, which every interpreter shares.
+
+"""
+
+import re
+
+from array import array
+from string import punctuation
+
+_INITIALS = re.compile(r'[\s.\-]')
+_YEAR = re.compile(r'\d{4}$')
+_VOLUME = re.compile(r'V[\dA-Z]?\d')
+_PAGE = re.compile(r'[Pp][\dA-Z]?\d')
+_MASK = dict.fromkeys(map(ord, punctuation), ' ')
+
+
+def format_author(surname, initials):
+    """Writes an author the way isi cited references do
+
+    :param str surname: author's surname
+    :param str initials: author's initials, possibly with dots
+    :returns: author as `Surname IN`
+    :rtype: str
+    """
+    initials = _INITIALS.sub('', initials)
+    return (surname + ' ' + initials) if initials else surname
+
+
+def format_source(source):
+    """Writes a source title the way isi cited references do
+
+    :param str source: source title or abbreviation
+    :returns: upper case source title with punctuation turned into
+        spaces
+    :rtype: str
+    """
+    return ' '.join(source.translate(_MASK).upper().split())
+
+
+def format_label(author, year='', source='', volume='', page='', doi='',
+                 article=''):
+    """Writes a label in the format of the isi cited references
+
+    Missing parts are left out, as in
+    `Smith J, 2001, NATURE, V410, P100, DOI 10.1038/35065000`.
+
+    :param str author: first author, see :func:`format_author`
+    :param str year: publication year
+    :param str source: source, see :func:`format_source`
+    :param str volume: volume number
+    :param str page: first page
+    :param str doi: digital object identifier
+    :param str article: article number, used when there is no first page
+    :returns: the label
+    :rtype: str
+    """
+    parts = [author, year, source]
+    if volume:
+        parts.append('V' + volume)
+    if page:
+        parts.append('P' + page)
+    elif article:
+        parts.append('p' + article.upper())
+    if doi:
+        parts.append('DOI ' + doi)
+    return ', '.join(part for part in parts if part)
+
+
+def parse_label(label):
+    """Splits a label in the format of the isi cited references into its
+    parts, the inverse of :func:`format_label`
+
+    Parts are recognized by their position and shape, missing parts are
+    left empty, and only the first of several DOIs is kept, as in
+    `Smith J, 2001, NATURE, V410, P100, DOI [10.1038/35065000, DOI ...]`.
+
+    :param str label: label to be split
+    :returns: author, year, source, volume, page and doi, the page being
+        the article number if there is no page
+    :rtype: tuple
+    """
+    author = year = source = volume = page = doi = ''
+    parts = label.split(', ')
+    position = 0
+
+    if not _YEAR.match(parts[0]) and not parts[0].startswith('DOI '):
+        author = parts[0]
+        position = 1
+    if position < len(parts) and _YEAR.match(parts[position]):
+        year = parts[position]
+        position += 1
+    # Sources may hold commas too
+    start = position
+    while (position < len(parts) and not _VOLUME.match(parts[position]) and
+           not _PAGE.match(parts[position]) and
+           not parts[position].startswith('DOI ')):
+        position += 1
+    source = ', '.join(parts[start:position])
+
+    for position in range(position, len(parts)):
+        part = parts[position]
+        if part.startswith('DOI '):
+            doi = part[4:].lstrip('[').rstrip(']')
+            break
+        elif not volume and part[:1] == 'V':
+            volume = part[1:]
+        elif not page and part[:1] in 'Pp':
+            page = part[1:]
+
+    return author, year, source, volume, page, doi
+
+
+class LabelTable(object):
+
+    """Assigns consecutive integer identifiers to labels
+
+    Every distinct label gets the next identifier the first time it is
+    interned and keeps it afterwards, the labels are stored once in
+    :attr:`labels`, indexed by their identifier.
+
+    :param labels: labels to be interned right away
+    """
+
+    def __init__(self, labels=()):
+        super(LabelTable, self).__init__()
+        self.labels = []
+        self.identifiers = {}
+        self.intern_all(labels)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __getitem__(self, identifier):
+        return self.labels[identifier]
+
+    def __contains__(self, label):
+        return label in self.identifiers
+
+    def __iter__(self):
+        return iter(self.labels)
+
+    def intern(self, label):
+        """Returns the identifier of a label, assigning one if it is new
+
+        :param str label: label to be interned
+        :returns: label's identifier
+        :rtype: int
+        """
+        try:
+            return self.identifiers[label]
+        except KeyError:
+            identifier = self.identifiers[label] = len(self.labels)
+            self.labels.append(label)
+            return identifier
+
+    def intern_all(self, labels):
+        """Interns several labels
+
+        :param labels: labels to be interned
+        :returns: the identifiers of the labels
+        :rtype: list
+        """
+        return list(map(self.intern, labels))
+
+    def remap(self, patch):
+        """Computes where every identifier goes after patching its label
+
+        :param dict patch: patch dictionary, as the duplicate map returned
+            by :func:`~tos.graph.utils.detect_duplicate_labels`
+        :returns: array holding the identifier of the patched label of
+            every identifier
+        :rtype: :class:`~array.array`
+        """
+        labels = self.labels[:]
+        return array('l', (self.intern(patch.get(label, label))
+                           for label in labels))
+
+
+class LabelFields(object):
+
+    """Parts of labels in the format of the isi cited references, kept in
+    columns
+
+    Labels are split once using :func:`parse_label`, the parts of the
+    label with identifier `i` are found at position `i` of every column,
+    so filtering labels by year or looking them up by DOI does not split
+    them again.
+
+    :param labels: labels to be split right away
+    """
+
+    def __init__(self, labels=()):
+        super(LabelFields, self).__init__()
+        #: Authors, as written in the labels
+        self.authors = []
+        #: Publication years, zero when missing
+        self.years = array('l')
+        #: Sources
+        self.sources = []
+        #: Volumes
+        self.volumes = []
+        #: Pages, or article numbers
+        self.pages = []
+        #: DOIs, the first one of labels with several
+        self.dois = []
+        self.extend(labels)
+
+    def __len__(self):
+        return len(self.authors)
+
+    def __getitem__(self, identifier):
+        return (self.authors[identifier], self.years[identifier],
+                self.sources[identifier], self.volumes[identifier],
+                self.pages[identifier], self.dois[identifier])
+
+    def extend(self, labels):
+        """Splits labels appending their parts to the columns
+
+        :param labels: labels to be split, in identifier order
+        """
+        columns = list(zip(*map(parse_label, labels)))
+        if not columns:
+            return
+        authors, years, sources, volumes, pages, dois = columns
+        self.authors.extend(authors)
+        self.years.extend(int(year) if year else 0 for year in years)
+        self.sources.extend(sources)
+        self.volumes.extend(volumes)
+        self.pages.extend(pages)
+        self.dois.extend(dois)
+
+    def in_years(self, first, last):
+        """Returns the identifiers of the labels published between two
+        years
+
+        :param int first: first year
+        :param int last: last year, included
+        :rtype: list
+        """
+        return [identifier for identifier, year in enumerate(self.years)
+                if first <= year <= last]
+
+    def doi_index(self):
+        """Maps the DOIs, lower cased, to the identifiers of the labels
+        carrying them
+
+        :rtype: dict
+        """
+        index = {}
+        for identifier, doi in enumerate(self.dois):
+            if doi:
+                index.setdefault(doi.lower(), []).append(identifier)
+        return index
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+"""
+Registry
+--------
+
+Keeps the known interpreters and detects which one understands an input by
+sniffing its first few kilobytes. Interpreter modules are imported only
+when their interpreter is requested.
+
+"""
+
+import csv
+import importlib
+import io
+import re
+
+from .sources import detect_compression
+from .sources import iter_streams
+from .sources import peek
+
+#: Number of bytes read to detect the format of an input
+SNIFF_SIZE = 8192
+
+_ISI = re.compile(r'\s*(?:FN|VR|PT|AU) ')
+_BIBTEX_KEY = re.compile(r'^\s*@\w+\s*\{\s*([^,\s]*)', re.MULTILINE)
+
+_REGISTRY = []
+
+
+def _is_isi(head):
+    return _ISI.match(head) is not None
+
+
+def _is_isi_bibtex(head):
+    match = _BIBTEX_KEY.search(head)
+    return match is not None and match.group(1).startswith(('ISI:', 'WOS:'))
+
+
+def _is_scopus_bibtex(head):
+    return _BIBTEX_KEY.search(head) is not None
+
+
+def _is_scopus_csv(head):
+    header = next(csv.reader(io.StringIO(head)), [''])
+    header[0] = header[0].lstrip('\ufeff')
+    return 'Authors' in header and 'Title' in header
+
+
+def register_interpreter(name, path, test):
+    """Registers an interpreter under a format name
+
+    Formats are tested in registration order by :func:`sniff_format`.
+
+    :param str name: name of the format
+    :param str path: where the interpreter class lives, as
+        `package.module:Class`, the module is imported on demand
+    :param test: function telling whether the head of an input, a string,
+        is written in this format
+    """
+    _REGISTRY.append((name, path, test))
+
+
+def get_interpreter(name, *args, **kwargs):
+    """Creates the interpreter registered under a format name
+
+    Positional and keyword arguments are handed to the interpreter.
+
+    :param str name: name of the format
+    :returns: an interpreter for the format
+    :rtype: :class:`~tos.interpreters.interpreter.BaseInterpreter`
+    """
+    for registered, path, _ in _REGISTRY:
+        if registered == name:
+            module, _, cls = path.partition(':')
+            return getattr(importlib.import_module(module), cls)(
+                *args, **kwargs)
+    raise KeyError('Unknown format %r' % (name, ))
+
+
+def read_head(source, size=SNIFF_SIZE):
+    """Reads the first characters of an input without consuming it
+
+    Compressed inputs are decompressed, compressed handlers must be
+    seekable since they are rewound afterwards.
+
+    :param source: path or handler of the input
+    :type source: str or file
+    :param int size: number of bytes to read
+    :returns: the head of the input
+    :rtype: str
+    """
+    if isinstance(source, str):
+        with open(source, 'rb') as handler:
+            return read_head(handler, size)
+
+    if isinstance(source, io.TextIOBase):
+        position = source.tell()
+        head = source.read(size)
+        source.seek(position)
+        return head.lstrip('\ufeff')
+
+    if detect_compression(source) is None:
+        head = peek(source, size)
+    else:
+        position = source.tell()
+        streams = iter_streams(source)
+        try:
+            head = next(streams, io.BytesIO()).read(size)
+        finally:
+            streams.close()
+        source.seek(position)
+
+    # The head may end in the middle of a character
+    return head.decode('utf-8', 'ignore').lstrip('\ufeff')
+
+
+def sniff_format(head):
+    """Detects the format of an input given its head
+
+    :param str head: first characters of the input, see :func:`read_head`
+    :returns: the name of the format, `None` if it is not known
+    :rtype: str
+    """
+    for name, _, test in _REGISTRY:
+        if test(head):
+            return name
+    return None
+
+
+def detect_interpreter(source, *args, **kwargs):
+    """Creates the interpreter understanding an input
+
+    Positional and keyword arguments are handed to the interpreter.
+
+    :param source: path or handler of the input, it is not consumed
+    :type source: str or file
+    :returns: an interpreter for the input
+    :rtype: :class:`~tos.interpreters.interpreter.BaseInterpreter`
+    :raises ValueError: when the format of the input is not known
+    """
+    name = sniff_format(read_head(source))
+    if name is None:
+        raise ValueError('Unknown input format')
+    return get_interpreter(name, *args, **kwargs)
+
+
+register_interpreter('isi', 'tos.interpreters.isitxt:IsiInterpreter',
+                     _is_isi)
+register_interpreter('isibib', 'tos.interpreters.isibib:IsiBibInterpreter',
+                     _is_isi_bibtex)
+register_interpreter('scopusbib',
+                     'tos.interpreters.scopusbib:ScopusBibInterpreter',
+                     _is_scopus_bibtex)
+register_interpreter('scopus',
+                     'tos.interpreters.scopustxt:ScopusCsvInterpreter',
+                     _is_scopus_csv)
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+"""
+Scopus BibTeX Interpreter
+-------------------------
+
+Specializes the class :class:`~tos.interpreters.bibtex.BibtexInterpreter`
+to interpret the scopus BibTeX file format, labels match the ones of
+:class:`~tos.interpreters.scopustxt.ScopusCsvInterpreter`.
+
+"""
+
+import re
+
+from .bibtex import BibtexInterpreter
+from .labels import format_label
+from .labels import format_source
+from .scopustxt import get_scopus_author
+from .scopustxt import get_scopus_reference_label
+
+#: Fields used to compute the entry label, the referenced labels and the
+#: entry identifier
+RECORD_FIELDS = ('author', 'year', 'abbrev_source_title', 'journal',
+                 'volume', 'pages', 'art_number', 'doi', 'references', 'url')
+
+_EID = re.compile(r'eid=([\w.\-]+)')
+
+
+class ScopusBibInterpreter(BibtexInterpreter):
+
+    """Interpreter for the scopus BibTeX export
+
+    :param fields: names of the fields to keep, `None` keeps every field,
+        it defaults to the fields needed to label and identify the entries
+    """
+
+    def __init__(self, fields=RECORD_FIELDS):
+        super(ScopusBibInterpreter, self).__init__(fields)
+
+    def get_entry_id(self, entry):
+        """Returns the scopus identifier of an entry, taken from its url
+
+        :param dict entry: Entry to be identified
+        :returns: Entry's identifier, `None` if it is missing
+        :rtype: str
+        """
+        match = _EID.search(entry.get('url', ''))
+        return None if match is None else match.group(1)
+
+    def get_entry_label(self, entry):
+        """Returns and entry label acording to its metadata
+
+        :param dict entry: Entry to be labeled
+        :returns: Entry's label
+        :rtype: str
+        """
+        author = entry.get('author', '').split(' and ')[0]
+        source = entry.get('abbrev_source_title') or entry.get('journal', '')
+        return format_label(
+            get_scopus_author(author),
+            entry.get('year', ''),
+            format_source(source),
+            entry.get('volume', ''),
+            entry.get('pages', '').split('-')[0],
+            entry.get('doi', ''),
+            entry.get('art_number', ''),
+        )
+
+    def get_referenced_labels(self, entry):
+        """Returns the references of an entry translated to labels
+
+        :param dict entry: Entry to extract the references from
+        :returns: Entry's reference list as labels
+        :rtype: list
+        """
+        references = entry.get('references', '')
+        if not references:
+            return []
+        return list(map(get_scopus_reference_label, references.split('; ')))
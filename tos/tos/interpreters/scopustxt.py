@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+
+"""
+Scopus CSV Interpreter
+----------------------
+
+Specializes the class :class:`~tos.interpreters.interpreter.BaseInterpreter`
+to interpret the scopus comma separated values file format, labels are
+written in the format of the isi cited references, so graphs coming from
+both databases can be merged.
+
+"""
+
+import csv
+import io
+import re
+
+from collections import OrderedDict
+
+from .interpreter import BaseInterpreter
+from .labels import format_author
+from .labels import format_label
+from .labels import format_source
+
+#: Columns used to compute the entry label, the referenced labels and the
+#: entry identifier
+RECORD_COLUMNS = ('Authors', 'Year', 'Source title',
+                  'Abbreviated Source Title', 'Volume', 'Page start',
+                  'Art. No.', 'DOI', 'References', 'EID')
+
+_AUTHOR = re.compile(r'\s*([^,;(]+?),?\s+((?:[A-Z][a-z]?\.[\s\-]*)+)')
+_YEAR = re.compile(r'\((\d{4})\)')
+_PAGE = re.compile(r'\bpp?\.\s*([A-Za-z]?\d+)')
+_NUMBER = re.compile(r'\d+')
+
+
+def get_scopus_author(authors):
+    """Returns the first author of a scopus author list as isi does
+
+    Both `Pereira S.I., Barros A.S.` and `Pereira, S.I.; Barros, A.S.`
+    styles are understood.
+
+    :param str authors: scopus author list
+    :returns: first author as `Surname IN`
+    :rtype: str
+    """
+    match = _AUTHOR.match(authors)
+    if match is None:
+        return authors.split(',')[0].split(';')[0].strip()
+    return format_author(match.group(1), match.group(2))
+
+
+def get_scopus_reference_label(reference):
+    """Translates a scopus reference into an isi like label
+
+    Understands the older style, where the year in parentheses precedes
+    the source, and the newer one, where it closes the reference.
+
+    :param str reference: a reference as it appears in scopus exports
+    :returns: the reference label
+    :rtype: str
+    """
+    reference = reference.strip()
+    author = get_scopus_author(reference)
+    year = source = volume = page = ''
+    # Part of the reference holding source, volume and pages
+    tail = reference
+
+    match = _YEAR.search(reference)
+    if match is not None:
+        year = match.group(1)
+        tail = reference[match.end():].strip(' ,.')
+        # Newer references end with the year, the source comes before it
+        if not tail:
+            tail = reference[:match.start()].strip(' ,.')
+        parts = tail.split(', ')
+        for index, part in enumerate(parts):
+            number = _NUMBER.match(part)
+            if number is not None and index > 0:
+                source = format_source(parts[index - 1])
+                volume = number.group()
+                break
+        else:
+            if match.end() < len(reference):
+                source = format_source(parts[0])
+
+    match = _PAGE.search(tail)
+    if match is not None:
+        page = match.group(1)
+
+    return format_label(author, year, source, volume, page)
+
+
+class ScopusCsvInterpreter(BaseInterpreter):
+
+    """Interpreter for the scopus comma separated values export
+
+    :param columns: columns to keep, the remaining columns are dropped,
+        `None` keeps every column, it defaults to the columns needed to
+        label and identify the entries
+    """
+
+    def __init__(self, columns=RECORD_COLUMNS):
+        super(ScopusCsvInterpreter, self).__init__()
+        self.columns = None if columns is None else frozenset(columns)
+
+    def split_entries(self, txt):
+        """Splits text into rows, each row is a dictionary of columns
+
+        :param txt: Text to split
+        :type txt: str
+        :returns: list of dictionaries containing each row
+        :rtype: list
+        """
+        return list(self.iter_entries(io.StringIO(txt)))
+
+    def iter_entries(self, handler):
+        """Splits a file handler into rows using the :mod:`csv` module
+
+        :param handler: handler for the file to be split
+        :type handler: file
+        :returns: an iterator over dictionaries containing each row
+        :rtype: iterator
+        """
+        reader = csv.reader(handler)
+        header = next(reader, None)
+        if header is None:
+            return
+        header[0] = header[0].lstrip('\ufeff')
+
+        for row in reader:
+            yield OrderedDict(zip(header, row))
+
+    def parse_entry(self, row):
+        """Keeps the wanted columns of a row and splits the references
+
+        :param dict row: An individual row
+        :returns: a dictionary containg metadata
+        :rtype: dict
+        """
+        columns = self.columns
+        data = OrderedDict(
+            (column, value) for column, value in row.items()
+            if columns is None or column in columns
+        )
+        if data.get('References'):
+            data['References'] = data['References'].split('; ')
+        else:
+            data.pop('References', None)
+        return data
+
+    def get_entry_id(self, entry):
+        """Returns the scopus identifier of an entry
+
+        :param dict entry: Entry to be identified
+        :returns: Entry's identifier, `None` if it is missing
+        :rtype: str
+        """
+        return entry.get('EID') or None
+
+    def get_entry_label(self, entry):
+        """Returns and entry label acording to its metadata
+
+        :param dict entry: Entry to be labeled
+        :returns: Entry's label
+        :rtype: str
+        """
+        source = (entry.get('Abbreviated Source Title') or
+                  entry.get('Source title', ''))
+        return format_label(
+            get_scopus_author(entry.get('Authors', '')),
+            entry.get('Year', ''),
+            format_source(source),
+            entry.get('Volume', ''),
+            entry.get('Page start', ''),
+            entry.get('DOI', ''),
+            entry.get('Art. No.', ''),
+        )
+
+    def get_referenced_labels(self, entry):
+        """Returns the references of an entry translated to labels
+
+        :param dict entry: Entry to extract the references from
+        :returns: Entry's reference list as labels
+        :rtype: list
+        """
+        return list(map(get_scopus_reference_label,
+                        entry.get('References', [])))
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+"""
+Sources
+-------
+
+Opens the files given to the interpreters, compressed files (gzip, bz2, xz
+and zip) are recognized by their magic number and decompressed as a stream,
+so they are never held in memory nor written uncompressed to disk.
+
+"""
+
+import bz2
+import contextlib
+import gzip
+import io
+import lzma
+import os
+import zipfile
+
+#: Magic numbers of the supported compression formats
+MAGIC_NUMBERS = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'PK\x03\x04', 'zip'),
+)
+
+_DECOMPRESSORS = {
+    'gzip': lambda handler: gzip.GzipFile(fileobj=handler, mode='rb'),
+    'bz2': bz2.BZ2File,
+    'xz': lzma.LZMAFile,
+}
+
+
+def list_files(directory):
+    """Lists the files of a directory in name order, hidden files skipped
+
+    :param str directory: path of the directory
+    :returns: the paths of the files
+    :rtype: list
+    """
+    return [
+        os.path.join(directory, name)
+        for name in sorted(os.listdir(directory))
+        if not name.startswith('.') and
+        os.path.isfile(os.path.join(directory, name))
+    ]
+
+
+def peek(handler, size):
+    """Returns the next bytes of a binary handler without consuming them
+
+    :param handler: binary file handler
+    :param int size: number of bytes wanted
+    :returns: up to `size` bytes, only the bytes already buffered when
+        the handler can be peeked but not rewound, empty when it can be
+        neither peeked nor rewound
+    :rtype: bytes
+    """
+    head = b''
+    if hasattr(handler, 'peek'):
+        # Peeking returns at most the buffer, which may be shorter
+        head = handler.peek(size)[:size]
+        if len(head) == size:
+            return head
+
+    try:
+        position = handler.tell()
+        data = handler.read(size)
+        handler.seek(position)
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return head
+
+    return data
+
+
+@contextlib.contextmanager
+def open_text(stream, encoding='utf-8'):
+    """Decodes a binary stream as text while it is read
+
+    Line endings are translated to ``'\\n'`` as each chunk is decoded, so
+    CRLF, and even mixed, files are read as any other one without peeking
+    at the stream. The stream is left open.
+
+    :param stream: binary stream
+    :param str encoding: encoding of the stream
+    :returns: a context manager yielding the text stream
+    """
+    text = io.TextIOWrapper(stream, encoding=encoding, newline=None)
+    try:
+        yield text
+    finally:
+        text.detach()
+
+
+def detect_compression(handler):
+    """Detects the compression of a binary handler by its magic number
+
+    :param handler: binary file handler, it is not consumed
+    :returns: `'gzip'`, `'bz2'`, `'xz'`, `'zip'` or `None` when the
+        contents are not compressed
+    :rtype: str
+    """
+    head = peek(handler, 8)
+    for magic, compression in MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def iter_streams(source):
+    """Opens a source yielding its decompressed binary streams
+
+    Uncompressed handlers are yielded as they are, gzip, bz2 and xz
+    contents are yielded as a single stream and zip archives yield one
+    stream per member file. Streams are decompressed while they are read.
+
+    :param source: path or binary handler of the file to be opened
+    :type source: str or file
+    :returns: an iterator over binary streams
+    :rtype: iterator
+    """
+    if isinstance(source, str):
+        with open(source, 'rb') as handler:
+            yield from iter_streams(handler)
+        return
+
+    compression = detect_compression(source)
+
+    if compression is None:
+        yield source
+    elif compression == 'zip':
+        if not source.seekable():
+            source = io.BytesIO(source.read())
+        with zipfile.ZipFile(source) as archive:
+            for member in archive.infolist():
+                if member.filename.endswith('/'):
+                    continue
+                with archive.open(member) as stream:
+                    yield stream
+    else:
+        with _DECOMPRESSORS[compression](source) as stream:
+            yield stream
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import argparse
+import os
 import requests
 import urllib
 import xml.dom.minidom
@@ -8,8 +9,9 @@ import xml.dom.minidom
 from subprocess import check_call
 from operator import methodcaller
 
-from tos.interpreters import IsiInterpreter
+from tos.interpreters import detect_interpreter
 from tos.graph.tree_of_science import TreeOfScience
+from tos.interpreters.labels import parse_label
 
 
 def get_url_from_doi(doi):
@@ -32,11 +34,12 @@ def open_url(url, program='xdg-open'):
 
 
 def has_doi(label):
-    return 'DOI' in label
+    return bool(get_doi_from_label(label))
 
 
 def get_doi_from_label(label):
-    return label.split(', ')[-1].split(' ')[-1]
+    # The DOI may not be the last part, and labels may carry several
+    return parse_label(label)[5]
 
 
 def build_argument_parser():
@@ -44,8 +47,9 @@ def build_argument_parser():
 
     parser.add_argument(
         'input',
-        help='input file to be parsed',
-        type=argparse.FileType('r'))
+        help='input file to be parsed, isi, scopus csv or bibtex, it may be '
+             'gzip, bz2, xz or zip compressed',
+        type=argparse.FileType('rb'))
 
     parser.add_argument(
         '--section',
@@ -66,6 +70,12 @@ def build_argument_parser():
         type=int,
         default=10)
 
+    parser.add_argument(
+        '--cache',
+        help='directory caching the parsed inputs, so they are parsed once',
+        type=str,
+        default=None)
+
     parser.add_argument(
         '--program',
         help='program to open the urls with, *open* should be good for mac',
@@ -76,19 +86,25 @@ def build_argument_parser():
 
 
 def handle_input(args):
-    tos = TreeOfScience(IsiInterpreter(), {'data': args.input.read()})
+    interpreter = detect_interpreter(args.input)
+    # Only files on disk can be cached, not pipes
+    if args.cache is not None and os.path.isfile(args.input.name):
+        config = {'path': args.input.name, 'cache': args.cache}
+    else:
+        config = {'file': args.input}
+    tos = TreeOfScience(interpreter, config)
     method = methodcaller(
         args.section,
         offset=args.offset,
         count=args.count)
 
-    labels = method(tos)['label']
+    vertices = method(tos)
     urls = []
 
-    for label in labels:
-        if has_doi(label):
+    for label, doi in zip(vertices['label'], vertices['doi']):
+        if doi:
             try:
-                urls.append(get_url_from_doi(get_doi_from_label(label)))
+                urls.append(get_url_from_doi(doi))
             except:
                 urls.append(get_url_from_label(label))
         else: